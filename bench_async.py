@@ -0,0 +1,64 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+import httpx
+
+# Kullanım: python bench_async.py [istek_sayisi] [eszamanlilik]
+# Varsayılan olarak yerel bir SQLite dosyası kullanılır (async tarafı için aiosqlite gerekir)
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_async.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///bench_async.db")
+
+import main13
+import main13_async
+
+# Şemayı oluştur ve ölçüm için örnek marka ve araçları ekle
+def seed(count: int = 200):
+    main13.bootstrap()
+    db = main13.SessionLocal()
+    if db.query(main13.Marka).count() == 0:
+        marka = main13.Marka(marka_ad="Bench")
+        db.add(marka)
+        db.flush()
+        araclar = [main13.AracBilgileriCreate(marka_id=marka.marka_id, seri=f"Seri{i}", renk="beyaz", yil=2015, yakit=2,
+                                              durum=2, kilometre=i * 1000, yakit_gucu="150", isActive=True)
+                   for i in range(count)]
+        db.add_all([main13.AracBilgileri(**values) for values in main13.arac_values(db, araclar)])
+        db.commit()
+    db.close()
+
+# Uygulamaya CONCURRENCY eşzamanlı bağlantı ile REQUESTS adet liste isteği gönder
+async def run(app, name: str):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/araclar/", params={"limit": 20})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(REQUESTS)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:6}: {REQUESTS / elapsed:8.0f} istek/sn, p50 {p50:7.1f} ms, p99 {p99:7.1f} ms, hata {errors}")
+
+if __name__ == "__main__":
+    seed()
+    # ASGITransport lifespan olaylarını göndermediğinden async motor burada oluşturulur
+    main13_async.get_async_engine()
+    print(f"{REQUESTS} istek, {CONCURRENCY} eşzamanlı bağlantı")
+    asyncio.run(run(main13.app, "sync"))
+    asyncio.run(run(main13_async.app, "async"))
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+# Kullanım: python bench_import.py [modul] [tekrar]
+# Modülü ayrı bir yorumlayıcıda "-X importtime" ile içe aktarır; modülün kendi süresini (self),
+# bağımlılıklarıyla toplam süresini (cumulative) ve en pahalı bağımlılıkları listeler.
+MODULE = sys.argv[1] if len(sys.argv) > 1 else "main13"
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+# Tek bir içe aktarmanın "-X importtime" çıktısını {modül: (self, cumulative)} (mikrosaniye) olarak döndür
+def import_times(module: str) -> dict:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=os.environ, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+if __name__ == "__main__":
+    runs = [import_times(MODULE) for _ in range(REPEAT)]
+    self_ms = min(run[MODULE][0] for run in runs) / 1000
+    cumulative_ms = min(run[MODULE][1] for run in runs) / 1000
+    print(f"{MODULE}: self {self_ms:.1f} ms, toplam {cumulative_ms:.1f} ms ({REPEAT} tekrarın en iyisi)")
+    for name, (self_us, _) in sorted(runs[-1].items(), key=lambda item: -item[1][0])[:10]:
+        print(f"  {self_us / 1000:7.1f} ms  {name}")
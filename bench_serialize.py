@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+import time
+
+# Kullanım: python bench_serialize.py [satir_sayisi] [tekrar]
+# /araclar/ yanıtının hazırlanmasını eski yol (ORM nesneleri + jsonable_encoder + json) ile
+# yeni yol (satır demetleri + orjson; orjson yoksa AracPage + Pydantic dump_json) arasında karşılaştırır.
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serialize.db')}")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+import main13
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Şemayı oluştur ve ölçüm için örnek araçları ekle
+def seed():
+    main13.bootstrap()
+    db = main13.SessionLocal()
+    if db.query(main13.AracBilgileri).count() == 0:
+        marka = main13.Marka(marka_ad="Bench")
+        db.add(marka)
+        db.flush()
+        araclar = [main13.AracBilgileriCreate(marka_id=marka.marka_id, seri=f"Seri{i % 300}", renk=f"renk{i % 12}", yil=2000 + i % 25,
+                                              yakit=1 + i % 4, durum=1 + i % 2, kilometre=i * 7, yakit_gucu="150", isActive=True)
+                   for i in range(ROWS)]
+        db.execute(insert(main13.AracBilgileri), main13.arac_values(db, araclar))
+        db.commit()
+    db.close()
+
+# Eski yol: ORM nesneleri, jsonable_encoder ile __dict__ dolaşımı, json.dumps
+def old_fetch(db):
+    return db.query(main13.AracBilgileri).limit(ROWS).all()
+
+def old_serialize(araclar) -> bytes:
+    return JSONResponse({"items": jsonable_encoder(araclar), "next_cursor": None}).body
+
+# Yeni yol: yalnızca okuma modelinin sütunları satır demeti olarak, AracPage ile doğrudan JSON baytları
+names = list(main13.AracRead.model_fields)
+columns = [getattr(main13.AracBilgileri, name) for name in names]
+page_adapter = TypeAdapter(main13.AracPage)
+
+def new_fetch(db):
+    rows = db.execute(select(*columns).limit(ROWS)).all()
+    return {"items": [{name: getattr(row, name) for name in names} for row in rows], "next_cursor": None}
+
+def new_serialize(page) -> bytes:
+    return page_adapter.dump_json(page_adapter.validate_python(page), exclude_unset=True)
+
+def orjson_serialize(page) -> bytes:
+    return orjson.dumps(page)
+
+# Her aşamanın en iyi süresini (ms) ölç
+def measure(fetch, serialize):
+    fetch_best = serialize_best = float("inf")
+    size = 0
+    for _ in range(REPEAT):
+        db = main13.SessionLocal()
+        start = time.perf_counter()
+        data = fetch(db)
+        fetched = time.perf_counter()
+        body = serialize(data)
+        done = time.perf_counter()
+        db.close()
+        fetch_best = min(fetch_best, fetched - start)
+        serialize_best = min(serialize_best, done - fetched)
+        size = len(body)
+    return fetch_best * 1000, serialize_best * 1000, size
+
+if __name__ == "__main__":
+    seed()
+    print(f"{ROWS} satır, {REPEAT} tekrarın en iyisi")
+    results = [("ORM + jsonable_encoder", measure(old_fetch, old_serialize)),
+               ("demet + AracPage dump_json", measure(new_fetch, new_serialize))]
+    if orjson is not None:
+        results.append(("demet + orjson", measure(new_fetch, orjson_serialize)))
+    for name, (fetch_ms, serialize_ms, size) in results:
+        print(f"{name:28}: okuma {fetch_ms:7.1f} ms, serileştirme {serialize_ms:7.1f} ms, toplam {fetch_ms + serialize_ms:7.1f} ms, {size / 1024:6.0f} KB")
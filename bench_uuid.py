@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+import uuid
+from sqlalchemy import create_engine, insert, text, Column, Integer, MetaData, String, Table, Uuid
+from main13 import uuid7
+
+# Kullanım: python bench_uuid.py [satir_sayisi] [DATABASE_URL]
+# Aynı tabloyu uuid4 metin anahtarla ve UUIDv7 Uuid anahtarla doldurur; ekleme hızını ve tablo+indeks boyutunu karşılaştırır.
+# URL verilmezse geçici SQLite dosyaları kullanılır.
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+URL = sys.argv[2] if len(sys.argv) > 2 else None
+BATCH = 1000
+
+# Tek seferde BATCH satır ekleyerek tabloyu doldur, saniyedeki satır sayısını döndür
+def fill(engine, table: Table, new_id) -> float:
+    table.metadata.drop_all(engine)
+    table.metadata.create_all(engine)
+    start = time.perf_counter()
+    for offset in range(0, ROWS, BATCH):
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": new_id(), "yil": 2000 + i % 25, "seri": f"Seri{i % 300}"}
+                                         for i in range(offset, min(offset + BATCH, ROWS))])
+    return ROWS / (time.perf_counter() - start)
+
+# Tablo ve indekslerinin diskte kapladığı alan (MB)
+def size_mb(engine, name: str) -> float:
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return conn.execute(text(f"SELECT pg_total_relation_size('{name}')")).scalar() / 1024 / 1024
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        return conn.execute(text("PRAGMA page_count")).scalar() * page_size / 1024 / 1024
+
+def run(url: str, name: str, id_type, new_id):
+    engine = create_engine(url)
+    table = Table(name, MetaData(), Column("id", id_type, primary_key=True),
+                  Column("yil", Integer, nullable=False), Column("seri", String, nullable=False))
+    rate = fill(engine, table, new_id)
+    size = size_mb(engine, name)
+    if URL:
+        table.metadata.drop_all(engine)
+    engine.dispose()
+    return rate, size
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        url_v4 = URL or f"sqlite:///{os.path.join(directory, 'v4.db')}"
+        url_v7 = URL or f"sqlite:///{os.path.join(directory, 'v7.db')}"
+        v4_rate, v4_size = run(url_v4, "bench_uuid4", String, lambda: str(uuid.uuid4()))
+        v7_rate, v7_size = run(url_v7, "bench_uuid7", Uuid, uuid7)
+    print(f"{ROWS} satır")
+    print(f"String + uuid4: {v4_rate:10,.0f} satır/sn, {v4_size:7.1f} MB")
+    print(f"Uuid + UUIDv7 : {v7_rate:10,.0f} satır/sn, {v7_size:7.1f} MB ({v7_rate / v4_rate:.2f}x hız)")
@@ -1,21 +1,118 @@
-from fastapi import FastAPI, HTTPException   # TODO SON SÜRÜM 1.3
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, Body   # TODO SON SÜRÜM 1.3
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, ValidationError
 from enum import Enum
-from datetime import datetime
-from sqlalchemy import create_engine, Column, String, Integer, Boolean, ForeignKey, TIMESTAMP, func
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, Column, String, Integer, SmallInteger, Boolean, UniqueConstraint, ForeignKey, TIMESTAMP, Uuid, Index, func, cast, delete, insert, literal, select, tuple_, true, false, update
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session, sessionmaker, relationship, column_property, load_only, validates
+from contextlib import asynccontextmanager
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
 import uuid
 
-# Veritabanı bağlantı bilgileri
-DATABASE_URL = ""
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# SQLAlchemy motorunu ve oturumu ayarlama
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Veritabanı bağlantı bilgileri
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+# Bağlantı havuzu ayarları (ortam değişkenleriyle değiştirilebilir)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Marka önbelleğinin geçerlilik süresi (saniye); süre dolunca markalar veritabanından yeniden okunur
+BRAND_CACHE_TTL = float(os.getenv("BRAND_CACHE_TTL", "30"))
+
+# Facet özet tablosunun yenilenme aralığı (saniye); 0 ise arka planda yenilenmez
+FACET_REFRESH_INTERVAL = float(os.getenv("FACET_REFRESH_INTERVAL", "60"))
+
+# Facet'lerde yılların gruplanacağı aralık (ör. 5 -> 2015, 2020, ...)
+FACET_YEAR_BUCKET = 5
+
+# Toplu araç eklemede tek INSERT (executemany) ile gönderilecek satır sayısı
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+# Havuzdan bağlantı alırken beklenen süre istatistikleri
+pool_stats = {"checkouts": 0, "wait_total": 0.0, "wait_max": 0.0, "timeouts": 0}
+pool_stats_lock = threading.Lock()
+
+# Bağlantı alma süresini ölçen havuz: yalnızca havuzda beklenen süre (gerekirse yeni bağlantı açma ve
+# pre-ping dahil) sayılır; threadpool kuyruğu ve ilk sorgudan önceki işler ölçüme girmez.
+# Karışım sınıfı olarak hem QueuePool'a hem main13_async'teki AsyncAdaptedQueuePool'a eklenir.
+class TimedPoolMixin:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with pool_stats_lock:
+                pool_stats["timeouts"] += 1
+            raise
+        wait = time.perf_counter() - started
+        with pool_stats_lock:
+            pool_stats["checkouts"] += 1
+            pool_stats["wait_total"] += wait
+            pool_stats["wait_max"] = max(pool_stats["wait_max"], wait)
+        return connection
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+# SQLAlchemy motoru ilk kullanımda (uygulama açılışında ya da komut satırı araçlarında) oluşturulur;
+# modülü içe aktarmak veritabanı sürücüsünü yüklemez ve bağlantı açmaz
+engine = None
+engine_lock = threading.Lock()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Motoru oluştur (bir kez) ve oturumları ona bağla
+def get_engine():
+    global engine
+    if engine is None:
+        with engine_lock:
+            if engine is None:
+                engine = create_engine(
+                    DATABASE_URL,
+                    poolclass=TimedQueuePool,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_timeout=POOL_TIMEOUT,
+                    pool_recycle=POOL_RECYCLE,
+                    pool_pre_ping=POOL_PRE_PING,
+                )
+                SessionLocal.configure(bind=engine)
+    return engine
 
 Base = declarative_base()
 
+# Zaman sıralı UUID (UUIDv7): ilk 48 bit milisaniye cinsinden zaman, kalanı rastgele.
+# Yeni kayıtlar B-tree indeksinin sonuna eklenir; uuid4'teki rastgele ekleme konumları ve indeks şişmesi olmaz.
+def uuid7() -> uuid.UUID:
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+# Oluşturulma zamanı uygulamada mikrosaniye hassasiyetle (UTC) verilir. Sunucu tarafı func.now() SQLite'ta
+# saniyeye yuvarlanmış metin yazar; aynı saniyedeki satırlar (createdTime, arac_id) imlecinin metin
+# karşılaştırmasında sayfa sınırında atlanırdı.
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 # Yakit Enum 
 class Yakit(int, Enum):
     benzin = 1
@@ -31,34 +128,200 @@ class Durum(int, Enum):
 # Markalar modeli
 class Marka(Base):
     __tablename__ = "markalar"
-    marka_id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    marka_id = Column(Uuid, primary_key=True, index=True, default=uuid7)
     marka_ad = Column(String, nullable=False, unique=True)
+    # Tekrar kontrolü için küçük harfli ve boşluksuz ad; benzersiz indeks sayesinde kontrol tek sorguda yapılır
+    marka_ad_normalized = Column(String, nullable=False, unique=True)
+    modifiedTime = Column("modifiedtime", TIMESTAMP, default=utcnow, server_default=func.now(), onupdate=utcnow, index=True)
+
+    # marka_ad her atandığında normalize edilmiş hali de güncellenir
+    @validates("marka_ad")
+    def normalize_marka_ad(self, key, value):
+        self.marka_ad_normalized = value.strip().lower()
+        return value
+
+# Seriler modeli: her seri bir markaya aittir (marka -> seri bire çok ilişkisi)
+class Seri(Base):
+    __tablename__ = "seriler"
+    seri_id = Column(Integer, primary_key=True)
+    marka_id = Column(Uuid, ForeignKey("markalar.marka_id", ondelete="CASCADE"), nullable=False)
+    seri_ad = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("marka_id", "seri_ad", name="uq_seriler_marka_id_seri_ad"),
+    )
+
+# Renkler modeli: renk adları bir kez saklanır, araçlar küçük tamsayı ile başvurur
+class Renk(Base):
+    __tablename__ = "renkler"
+    # SQLite'ta otomatik artan anahtar yalnızca INTEGER PRIMARY KEY ile mümkün
+    renk_id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    renk_ad = Column(String, nullable=False, unique=True)
 
 # Arac Bilgileri modeli
 class AracBilgileri(Base):
     __tablename__ = "arac_bilgileri"
-    arac_id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    marka_id = Column(String, ForeignKey("markalar.marka_id", ondelete="CASCADE"))
-    seri = Column(String, nullable=False)
-    renk = Column(String, nullable=False)
+    arac_id = Column(Uuid, primary_key=True, index=True, default=uuid7)
+    marka_id = Column(Uuid, ForeignKey("markalar.marka_id", ondelete="CASCADE"))
+    seri_id = Column(Integer, ForeignKey("seriler.seri_id"), nullable=False, index=True)
+    renk_id = Column(SmallInteger, ForeignKey("renkler.renk_id"), nullable=False, index=True)
+    # API'de seri ve renk adları döner; satırla aynı sorguda birincil anahtar üzerinden okunur (salt okunur)
+    seri = column_property(select(Seri.seri_ad).where(Seri.seri_id == seri_id).scalar_subquery())
+    renk = column_property(select(Renk.renk_ad).where(Renk.renk_id == renk_id).scalar_subquery())
     yil = Column(Integer, nullable=False)
     yakit = Column(Integer, nullable=False)
-    durum = Column(String, nullable=False)
+    durum = Column(SmallInteger, nullable=False)
     kilometre = Column(Integer, nullable=False)
     yakit_gucu = Column(String, nullable=False)
     isActive = Column("isactive", Boolean, default=True)
-    createdTime = Column("createdtime", TIMESTAMP, server_default=func.now())
-    modifiedTime = Column("modifiedtime", TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    createdTime = Column("createdtime", TIMESTAMP, default=utcnow, server_default=func.now())
+    modifiedTime = Column("modifiedtime", TIMESTAMP, default=utcnow, server_default=func.now(), onupdate=utcnow, index=True)
 
     marka = relationship("Marka", back_populates="araclar")
 
+    # Sayfalama sırası (createdTime, arac_id) ve marka bazlı listeleme için bileşik indeksler; aktif araç listesi için yalnızca
+    # aktif satırları içeren kısmi indeks (pasif geçmiş büyüdükçe indeks büyümez)
+    __table_args__ = (
+        Index("ix_arac_bilgileri_createdtime_arac_id", "createdtime", "arac_id"),
+        Index("ix_arac_bilgileri_marka_id_createdtime_arac_id", "marka_id", "createdtime", "arac_id"),
+        Index("ix_arac_bilgileri_active_createdtime_arac_id", "createdtime", "arac_id",
+              postgresql_where=isActive == true(), sqlite_where=isActive == true()),
+    )
+
 Marka.araclar = relationship("AracBilgileri", back_populates="marka", cascade="all, delete-orphan")
 
-# Veritabanını başlat
-Base.metadata.create_all(bind=engine)
+# Facet özet tablosu: aktif araçların yakıt, durum, marka ve yıl aralığına göre sayıları.
+# Facet istekleri yalnızca bu küçük tabloyu okur, arac_bilgileri taranmaz.
+class AracFacet(Base):
+    __tablename__ = "arac_facets"
+    facet = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+# Tablo yazım sayaçları: her tablo için tek satır. Tabloya yazan her işlem sayacı aynı işlem içinde artırır,
+# sayaç commit ile birlikte görünür. ETag saat hassasiyetine bağlı kalmaz: aynı saniyedeki güncellemeler
+# (SQLite) ya da işlem başlangıç zamanını yazan now() (PostgreSQL) sürümü yine değiştirir.
+class TabloSurumu(Base):
+    __tablename__ = "tablo_surumleri"
+    tablo = Column(String, primary_key=True)
+    surum = Column(Integer, nullable=False, default=0)
+
+# Sürümü izlenen tablolar
+VERSIONED_MODELS = [Marka, AracBilgileri]
+
+# Veritabanı şemasını oluştur (tablolar, indeksler ve sayaç satırları). Uygulama açılışında değil, kurulumda bir kez çalıştırılır:
+#   DATABASE_URL=... python main13.py bootstrap
+def bootstrap():
+    Base.metadata.create_all(bind=get_engine())
+    with get_engine().begin() as conn:
+        existing = set(conn.scalars(select(TabloSurumu.tablo)))
+        missing = [{"tablo": model.__tablename__, "surum": 0} for model in VERSIONED_MODELS if model.__tablename__ not in existing]
+        if missing:
+            conn.execute(insert(TabloSurumu), missing)
+
+# Verilen tabloların yazım sayaçlarını artıran UPDATE; yazımla aynı oturumda commit'ten önce çalıştırılır
+def bump_versions(*models):
+    names = [model.__tablename__ for model in models]
+    return update(TabloSurumu).where(TabloSurumu.tablo.in_(names)).values(surum=TabloSurumu.surum + 1)
+
+# Marka önbelleği: marka_id -> marka_ad. Aynı işçideki marka değişiklikleri önbelleği hemen günceller,
+# diğer işçilerdeki değişiklikler en geç BRAND_CACHE_TTL sonra yeniden yüklemeyle görülür
+brand_cache: Dict[str, str] = {}
+brand_cache_loaded = 0.0
+brand_cache_lock = threading.Lock()
+
+# Tüm markaları tek sorguyla önbelleğe yükle
+def load_brand_cache(db: Session):
+    global brand_cache_loaded
+    rows = db.execute(select(Marka.marka_id, Marka.marka_ad)).all()
+    with brand_cache_lock:
+        brand_cache.clear()
+        brand_cache.update(rows)
+        brand_cache_loaded = time.monotonic()
+
+# Verilen marka_id'lerden var olanları döndür; önbellekte olmayanlar (başka bir işçide yeni eklenmiş
+# olabilir) tek IN sorgusuyla veritabanında aranır ve bulunursa önbelleğe eklenir
+def existing_marka_ids(db: Session, marka_ids) -> set:
+    if time.monotonic() - brand_cache_loaded > BRAND_CACHE_TTL:
+        load_brand_cache(db)
+    with brand_cache_lock:
+        found = {marka_id for marka_id in marka_ids if marka_id in brand_cache}
+    missing = set(marka_ids) - found
+    if missing:
+        rows = db.execute(select(Marka.marka_id, Marka.marka_ad).where(Marka.marka_id.in_(missing))).all()
+        with brand_cache_lock:
+            brand_cache.update(rows)
+        found.update(marka_id for marka_id, _ in rows)
+    return found
+
+# Araç yazımını kaydet; marka önbellekten geçip başka bir işçide silinmişse yabancı anahtar reddeder
+def commit_arac(db: Session, marka_id: uuid.UUID):
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        with brand_cache_lock:
+            brand_cache.pop(marka_id, None)
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+
+# Facet sayımlarını üreten GROUP BY sorguları (facet, değer, sayı)
+def facet_queries():
+    active = AracBilgileri.isActive == true()
+    year_bucket = (AracBilgileri.yil // FACET_YEAR_BUCKET) * FACET_YEAR_BUCKET
+    yield select(literal("yakit", String), cast(AracBilgileri.yakit, String), func.count()).where(active).group_by(AracBilgileri.yakit)
+    yield select(literal("durum", String), cast(AracBilgileri.durum, String), func.count()).where(active).group_by(AracBilgileri.durum)
+    yield select(literal("marka", String), Marka.marka_ad, func.count()).join(AracBilgileri.marka).where(active).group_by(Marka.marka_ad)
+    yield select(literal("yil", String), cast(year_bucket, String), func.count()).where(active).group_by(year_bucket)
+
+# Facet özet tablosunu verilen bağlantının işleminde yeniden hesapla (sorgular veritabanında INSERT ... SELECT olarak çalışır)
+def write_facets(conn):
+    conn.execute(delete(AracFacet))
+    for query in facet_queries():
+        conn.execute(insert(AracFacet).from_select(["facet", "value", "count"], query))
+
+# Facet özet tablosunu tek işlemde yeniden hesapla
+def refresh_facets():
+    with get_engine().begin() as conn:
+        write_facets(conn)
+
+# Facet tablosunu yanıt biçimine çevir
+def read_facet_counts(db: Session) -> dict:
+    facets = {"yakit": {}, "durum": {}, "marka": {}, "yil": {}}
+    for facet, value, count in db.execute(select(AracFacet.facet, AracFacet.value, AracFacet.count)):
+        facets.setdefault(facet, {})[value] = count
+    return facets
+
+# Facet tablosunu FACET_REFRESH_INTERVAL aralıklarla yenile; başka bir işçi aynı anda yeniliyorsa
+# ya da veritabanı geçici olarak erişilemezse bir sonraki tura bırakılır
+def refresh_facets_periodically(stop: threading.Event):
+    while True:
+        try:
+            refresh_facets()
+        except SQLAlchemyError:
+            pass
+        if stop.wait(FACET_REFRESH_INTERVAL):
+            return
+
+# Uygulama açılırken motoru oluştur, marka önbelleğini doldur ve facet yenileyiciyi başlat;
+# kapanırken yenileyiciyi durdur ve havuzdaki bağlantıları kapat
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_engine()
+    db = SessionLocal()
+    try:
+        load_brand_cache(db)
+    finally:
+        db.close()
+
+    stop = threading.Event()
+    if FACET_REFRESH_INTERVAL > 0:
+        threading.Thread(target=refresh_facets_periodically, args=(stop,), daemon=True).start()
+    yield
+    stop.set()
+    engine.dispose()
 
 # FastAPI uygulaması
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Pydantic modelleri
 class MarkaCreate(BaseModel):
@@ -68,7 +331,7 @@ class MarkaUpdate(BaseModel):
     marka_ad: str
 
 class AracBilgileriCreate(BaseModel):
-    marka_id: str
+    marka_id: uuid.UUID
     seri: str
     renk: str
     yil: int
@@ -79,7 +342,7 @@ class AracBilgileriCreate(BaseModel):
     isActive: bool
 
 class AracBilgileriUpdate(BaseModel):
-    marka_id: str
+    marka_id: uuid.UUID
     seri: str
     renk: str
     yil: int
@@ -89,182 +352,492 @@ class AracBilgileriUpdate(BaseModel):
     yakit_gucu: str
     isActive: bool
 
-# CRUD İşlemleri
+# Okuma modelleri: yanıt modeli tanımlı uç noktalarda FastAPI yanıtı Pydantic'in Rust çekirdeğiyle
+# doğrudan JSON baytlarına çevirir (jsonable_encoder ile ORM nesnelerinin __dict__'i dolaşılmaz).
+# fields= ile seyrek yanıt istenebildiğinden alanlar varsayılan None alır ve yalnızca dolu alanlar yazılır.
+class MarkaRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    marka_id: Optional[uuid.UUID] = None
+    marka_ad: Optional[str] = None
+    modifiedTime: Optional[datetime] = None
+
+class AracRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    arac_id: Optional[uuid.UUID] = None
+    marka_id: Optional[uuid.UUID] = None
+    seri: Optional[str] = None
+    renk: Optional[str] = None
+    yil: Optional[int] = None
+    yakit: Optional[int] = None
+    durum: Optional[int] = None
+    kilometre: Optional[int] = None
+    yakit_gucu: Optional[str] = None
+    isActive: Optional[bool] = None
+    createdTime: Optional[datetime] = None
+    modifiedTime: Optional[datetime] = None
+
+class MarkaAraclarRead(MarkaRead):
+    araclar: Optional[List[AracRead]] = None
+
+class AracPage(BaseModel):
+    items: List[AracRead]
+    next_cursor: Optional[str] = None
+
+class MarkaPage(BaseModel):
+    items: List[MarkaAraclarRead]
+    next_cursor: Optional[str] = None
+
+# Sayfalama: son satırın sıralama anahtarını taşıyan opak imleç (base64 JSON)
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Sayfalama imleci geçersiz.")
+    return values
+
+# Koşullu GET: yanıtta yer alan her tablonun sürümünü (yazım sayacı, en son modifiedTime ve satır sayısı) satırlara
+# dokunmadan tek sorguda hesapla, istemcinin elindeki ETag güncelse 304 döndürülebileceğini bildir.
+# If-Modified-Since ile 304 verilmez: silme en son modifiedTime'ı değiştirmez ve Last-Modified saniyeye
+# yuvarlandığından aynı saniyedeki yazımlar görünmez; Last-Modified yalnızca bilgi amaçlı gönderilir.
+def conditional_headers(db, request: Request, *models) -> Tuple[dict, bool]:
+    columns = []
+    for model in models:
+        columns.append(select(TabloSurumu.surum).where(TabloSurumu.tablo == model.__tablename__).scalar_subquery())
+        columns.append(select(func.max(model.modifiedTime)).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+    versions = db.execute(select(*columns)).one()
+    version = "|".join(map(str, versions)) + f"|{request.url.query}"
+    etag = '"' + hashlib.md5(version.encode()).hexdigest() + '"'
+    headers = {"ETag": etag}
+    last_modified = max((value for value in versions[1::3] if value is not None), default=None)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return headers, etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    return headers, False
+
+# Araç girdisini temizle ve doğrula (ekleme ve güncellemede ortak)
+def clean_arac(arac):
+    # Girilen değerlerdeki boşlukları temizle
+    arac.seri = arac.seri.strip()
+    arac.renk = arac.renk.strip()
+    arac.yakit_gucu = arac.yakit_gucu.strip()
 
-# Marka Ekleme (POST)
-@app.post("/markalar/")
-def create_marka(marka: MarkaCreate):
-    db = SessionLocal()
+    # "yil" kontrolü - İçinde bulunduğumuz yıldan büyük olamaz, negatif olamaz
+    current_year = datetime.now().year
+    if arac.yil > current_year or arac.yil < 0:
+        raise HTTPException(status_code=400, detail="Yıl değeri geçersiz. Yıl, içinde bulunduğumuz yıldan büyük veya negatif olamaz.")
+
+    # "kilometre" kontrolü - Negatif olamaz
+    if arac.kilometre < 0:
+        raise HTTPException(status_code=400, detail="Kilometre değeri negatif olamaz.")
 
-    # Büyük/küçük harf ve boşluk kontrolü ile marka adını normalize et
-    normalized_marka_ad = marka.marka_ad.strip().lower()
+# Arama tablosunda verilen anahtarların kimliklerini döndür; olmayanlar tek INSERT ile eklenir.
+# Anahtarlardan birini başka bir istek aynı anda eklerse benzersiz kısıt tüm INSERT'i reddeder; bu durumda
+# hâlâ eksik olan anahtarlar tek tek (her biri kendi savepoint'inde) eklenir ve kimlikler yeniden okunur.
+def lookup_ids(db: Session, model, id_column, key_columns: list, keys: set) -> dict:
+    names = [column.key for column in key_columns]
+
+    def fetch():
+        condition = tuple_(*key_columns).in_(list(keys)) if len(key_columns) > 1 else key_columns[0].in_([key[0] for key in keys])
+        return {tuple(row[1:]): row[0] for row in db.execute(select(id_column, *key_columns).where(condition))}
+
+    def insert_keys(missing) -> bool:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model), [dict(zip(names, key)) for key in missing])
+        except IntegrityError:
+            return False
+        return True
+
+    found = fetch()
+    missing = keys - found.keys()
+    if missing:
+        if not insert_keys(missing):
+            found = fetch()
+            for key in keys - found.keys():
+                insert_keys([key])
+        found = fetch()
+    return found
+
+# Temizlenmiş araç girdilerini tablo sütunlarına çevir: seri ve renk adları seri_id/renk_id olur.
+# Serisi eklenemeyen araç için None döner: marka önbellekten geçmiş ama başka bir işçide silinmiştir ve
+# yabancı anahtar seri eklemesini reddetmiştir; marka önbellekten çıkarılır, çağıran geçersiz marka olarak raporlar.
+def arac_values(db: Session, araclar: list) -> List[Optional[dict]]:
+    seri_ids = lookup_ids(db, Seri, Seri.seri_id, [Seri.marka_id, Seri.seri_ad], {(arac.marka_id, arac.seri) for arac in araclar})
+    renk_ids = lookup_ids(db, Renk, Renk.renk_id, [Renk.renk_ad], {(arac.renk,) for arac in araclar})
+    values = []
+    for arac in araclar:
+        if (arac.marka_id, arac.seri) not in seri_ids:
+            with brand_cache_lock:
+                brand_cache.pop(arac.marka_id, None)
+            values.append(None)
+            continue
+        row = arac.dict(exclude={"seri", "renk"})
+        row["seri_id"] = seri_ids[(arac.marka_id, arac.seri)]
+        row["renk_id"] = renk_ids[(arac.renk,)]
+        values.append(row)
+    return values
+
+# ?fields= değerini okuma modelinin alanlarına göre doğrula ("arac_id,seri,yil" -> ["arac_id", "seri", "yil"])
+def parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in model.model_fields or name == "araclar"]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"Geçersiz alan: {', '.join(unknown) or fields}")
+    return names
+
+# Sorguda yalnızca istenen sütunları (ve sayfalama anahtarlarını) SELECT et
+def only_fields(query, model, fields: Optional[List[str]], keys: list):
+    if fields is None:
+        return query
+    return query.options(load_only(*[getattr(model, name) for name in dict.fromkeys(fields + keys)]))
+
+# Nesneleri yalnızca istenen alanları içeren sözlüklere çevir
+def pick_fields(rows: list, fields: List[str]) -> list:
+    return [{name: getattr(row, name) for name in fields} for row in rows]
+
+# Araçları (createdTime, arac_id) sırasına göre imleçle sayfala, isteğe bağlı aktiflik, seri ve renk filtresi uygula.
+# ORM nesnesi yerine yalnızca istenen sütunlar satır demeti olarak okunur ve sözlüğe çevrilir.
+def page_araclar(db: Session, conditions: list, limit: int, cursor: Optional[str], active: Optional[bool], seri: Optional[str] = None, renk: Optional[str] = None, fields: Optional[List[str]] = None) -> dict:
+    names = fields or list(AracRead.model_fields)
+    columns = [getattr(AracBilgileri, name) for name in dict.fromkeys(names + ["createdTime", "arac_id"])]
+    query = select(*columns).where(*conditions).order_by(AracBilgileri.createdTime, AracBilgileri.arac_id)
+    # Koşul parametre yerine sabitle (isactive = true) yazılır ki kısmi indeksin koşuluyla eşleşsin
+    if active is not None:
+        query = query.where(AracBilgileri.isActive == (true() if active else false()))
+    # Seri ve renk adları arama tablosunda kimliğe çevrilir, araçlar tamsayı indeksleri üzerinden süzülür
+    if seri is not None:
+        query = query.where(AracBilgileri.seri_id.in_(select(Seri.seri_id).where(Seri.seri_ad == seri.strip())))
+    if renk is not None:
+        query = query.where(AracBilgileri.renk_id == select(Renk.renk_id).where(Renk.renk_ad == renk.strip()).scalar_subquery())
+    if cursor:
+        last_created, last_arac_id = decode_cursor(cursor, 2)
+        try:
+            last_created = datetime.fromisoformat(last_created)
+            last_arac_id = uuid.UUID(last_arac_id)
+        except (TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Sayfalama imleci geçersiz.")
+        query = query.where(tuple_(AracBilgileri.createdTime, AracBilgileri.arac_id) > tuple_(last_created, last_arac_id))
+    rows = db.execute(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.createdTime.isoformat(), last.arac_id])
+    return {"items": [{name: getattr(row, name) for name in names} for row in rows], "next_cursor": next_cursor}
+
+# include=araclar için sayfadaki markaların araçlarını tek sorguda oku: her markadan (createdTime, arac_id) sırasıyla
+# en fazla limit araç (ROW_NUMBER ile marka başına sınır). Çok araçlı bir marka yanıtı büyütmez; tam liste
+# /markalar/{marka_id}/araclar üzerinden sayfalanarak alınır.
+def marka_araclari(db: Session, marka_ids: list, limit: int) -> Dict[uuid.UUID, List[dict]]:
+    names = list(AracRead.model_fields)
+    sira = func.row_number().over(partition_by=AracBilgileri.marka_id, order_by=(AracBilgileri.createdTime, AracBilgileri.arac_id))
+    ranked = select(*[getattr(AracBilgileri, name).label(name) for name in names], sira.label("sira")) \
+        .where(AracBilgileri.marka_id.in_(marka_ids)).subquery()
+    query = select(*[ranked.c[name] for name in names]).where(ranked.c.sira <= limit).order_by(ranked.c.marka_id, ranked.c.sira)
+    araclar: Dict[uuid.UUID, List[dict]] = {marka_id: [] for marka_id in marka_ids}
+    for row in db.execute(query):
+        araclar[row.marka_id].append({name: getattr(row, name) for name in names})
+    return araclar
 
-    # Aynı isimde bir marka olup olmadığını kontrol et
-    existing_marka = db.query(Marka).filter(func.lower(Marka.marka_ad) == normalized_marka_ad).first()
-    if existing_marka:
+# Marka sayfasını oku: marka_id sırasına göre imleçli sayfalama, isteğe bağlı sayfadaki markaların araçları
+def markalar_page(db: Session, limit: int, cursor: Optional[str], include: Optional[str], araclar_limit: int, fields: Optional[List[str]]) -> dict:
+    query = only_fields(db.query(Marka), Marka, fields, ["marka_id"]).order_by(Marka.marka_id)
+    if include not in (None, "araclar"):
+        raise HTTPException(status_code=400, detail="include yalnızca 'araclar' olabilir.")
+    if cursor:
+        (last_marka_id,) = decode_cursor(cursor, 1)
+        try:
+            last_marka_id = uuid.UUID(last_marka_id)
+        except (TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Sayfalama imleci geçersiz.")
+        query = query.filter(Marka.marka_id > last_marka_id)
+    markalar = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(markalar) > limit:
+        markalar = markalar[:limit]
+        next_cursor = encode_cursor([markalar[-1].marka_id])
+    items = pick_fields(markalar, fields or list(MarkaRead.model_fields))
+    if include == "araclar" and markalar:
+        araclar = marka_araclari(db, [marka.marka_id for marka in markalar], araclar_limit)
+        for marka, item in zip(markalar, items):
+            item["araclar"] = araclar[marka.marka_id]
+    return {"items": items, "next_cursor": next_cursor}
+
+# Toplu araç ekleme: tüm satırlar doğrulanır, geçerli olanlar tek işlemde toplu eklenir; hatalı satırlar listede döner
+def import_araclar(db: Session, records: List[dict]) -> dict:
+    # 1. Her satırı ayrı doğrula; hatalı satırlar eklenmez, hata listesinde döner
+    araclar = []
+    errors = []
+    for i, record in enumerate(records):
+        try:
+            arac = AracBilgileriCreate(**record)
+            clean_arac(arac)
+        except ValidationError as error:
+            errors.append({"row": i, "error": "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())})
+            continue
+        except HTTPException as error:
+            errors.append({"row": i, "error": error.detail})
+            continue
+        araclar.append((i, arac))
+
+    # 2. Geçen tüm marka_id'leri önbellekten, önbellekte olmayanları tek IN sorgusuyla kontrol et
+    found = existing_marka_ids(db, {arac.marka_id for _, arac in araclar})
+
+    valid = []
+    for i, arac in araclar:
+        if arac.marka_id not in found:
+            errors.append({"row": i, "error": "Marka ID eksik veya hatalı."})
+            continue
+        valid.append((i, arac))
+
+    # 3. Seri ve renk adlarını tüm satırlar için birlikte kimliğe çevir; serisi eklenemeyen (markası silinmiş) satırlar raporlanır
+    ids = [None] * len(records)
+    rows = []
+    for (i, _), row in zip(valid, arac_values(db, [arac for _, arac in valid])):
+        if row is None:
+            errors.append({"row": i, "error": "Marka ID eksik veya hatalı."})
+            continue
+        row["arac_id"] = ids[i] = uuid7()
+        rows.append(row)
+
+    # 4. Satırları BULK_BATCH_SIZE'lık gruplar halinde executemany ile ekle, tek seferde commit et
+    try:
+        for start in range(0, len(rows), BULK_BATCH_SIZE):
+            db.execute(insert(AracBilgileri), rows[start:start + BULK_BATCH_SIZE])
+        if rows:
+            db.execute(bump_versions(AracBilgileri))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Araçlar eklenemedi, hiçbir kayıt yazılmadı.")
+
+    errors.sort(key=lambda error: error["row"])
+    return {"added": len(rows), "ids": ids, "errors": errors}
+
+# Satır demetlerinden üretilen araç sayfası zaten AracRead alanlarından oluşur; orjson varsa yeniden
+# doğrulanmadan doğrudan yazılır, yoksa FastAPI yanıt modeliyle (Pydantic dump_json) serileştirir
+def list_response(page: dict, headers: dict):
+    if orjson is None:
+        return page
+    return Response(content=orjson.dumps(page), media_type="application/json", headers=headers)
+
+# Veritabanı oturumu: her istek için açılır, hata olsa da kapatılır.
+# Bağlantı açılışta değil ilk sorguda, uç nokta kendi iş parçacığında çalışırken alınır; böylece havuzu
+# bekleyen iş parçacıkları bağlantıyı tutan isteklerin bitmesini engellemez. Kapanış (bağlantıyı havuza
+# iade eden ROLLBACK) FastAPI tarafından threadpool sınırı dışında, olay döngüsünü bloklamadan çalıştırılır.
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
         db.close()
-        raise HTTPException(status_code=400, detail="Bu marka adı zaten mevcut.")
 
-    # Yeni marka kaydını oluştur
+# Havuzdan süresi içinde bağlantı alınamazsa 503 döndür
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Veritabanı bağlantı havuzu dolu."})
+
+# Bağlantı havuzunun durumu ve bekleme istatistikleri
+def pool_status(pool) -> dict:
+    with pool_stats_lock:
+        stats = dict(pool_stats)
+    stats["wait_avg"] = stats["wait_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    stats.update({
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "status": pool.status(),
+    })
+    return stats
+
+# Bağlantı havuzu durumu ve bekleme istatistikleri
+@app.get("/pool/stats")
+def read_pool_stats():
+    return pool_status(get_engine().pool)
+
+# CRUD İşlemleri
+
+# Marka Ekleme (POST)
+@app.post("/markalar/", response_model=MarkaRead)
+def create_marka(marka: MarkaCreate, db: Session = Depends(get_db)):
+    # Yeni marka kaydını oluştur; aynı isimde bir marka varsa marka_ad_normalized benzersiz indeksi reddeder
     db_marka = Marka(marka_ad=marka.marka_ad.strip())
     db.add(db_marka)
-    db.commit()
+    db.execute(bump_versions(Marka))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Bu marka adı zaten mevcut.")
     db.refresh(db_marka)
-    db.close()
+    with brand_cache_lock:
+        brand_cache[db_marka.marka_id] = db_marka.marka_ad
     return db_marka
 
-# Marka Listeleme (GET)
-@app.get("/markalar/")
-def read_markalar():
-    db = SessionLocal()
-    markalar = db.query(Marka).all()
-    db.close()
-    return markalar
+# Marka Listeleme (GET) - marka_id sırasına göre imleçli sayfalama;
+# include=araclar ile sayfadaki markaların araçları tek ek sorguda yüklenir. Her markanın listesi en eski
+# araclar_limit araçla sınırlıdır (varsayılan 20, en fazla 100); tamamı /markalar/{marka_id}/araclar ile alınır.
+# fields=marka_id,marka_ad ile yalnızca istenen sütunlar seçilir
+@app.get("/markalar/", response_model=MarkaPage, response_model_exclude_unset=True)
+def read_markalar(request: Request, response: Response, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, include: Optional[str] = None, araclar_limit: int = Query(20, ge=1, le=100), fields: Optional[str] = None, db: Session = Depends(get_db)):
+    fields = parse_fields(fields, MarkaRead)
+    # include=araclar yanıtı araçları da içerdiğinden ETag araç tablosunun sürümünü de kapsar
+    models = [Marka, AracBilgileri] if include == "araclar" else [Marka]
+    headers, not_modified = conditional_headers(db, request, *models)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    return markalar_page(db, limit, cursor, include, araclar_limit, fields)
 
 # Marka Güncelleme (PUT)
-@app.put("/markalar/{marka_id}")
-def update_marka(marka_id: str, marka: MarkaUpdate):
-    db = SessionLocal()
-
+@app.put("/markalar/{marka_id}", response_model=MarkaRead)
+def update_marka(marka_id: uuid.UUID, marka: MarkaUpdate, db: Session = Depends(get_db)):
     # marka_id girildiğinde eksik veya hatalıysa hata mesajı döndür
     db_marka = db.query(Marka).filter(Marka.marka_id == marka_id).first()
     if not db_marka:
-        db.close()
         raise HTTPException(status_code=400, detail="Marka ID hatalı veya eksik girdiniz.")
 
-    # marka_ad güncellenmek isteniyorsa ve aynı isimde bir marka zaten varsa hata mesajı döndür
-    normalized_marka_ad = marka.marka_ad.strip().lower()
-    existing_marka = db.query(Marka).filter(func.lower(Marka.marka_ad) == normalized_marka_ad).first()
-    
-    if existing_marka and existing_marka.marka_id != marka_id:
-        db.close()
-        raise HTTPException(status_code=400, detail="Böyle bir marka zaten mevcut.")
-
-    # Marka adını güncelle
+    # Marka adını güncelle; aynı isimde başka bir marka varsa benzersiz indeks reddeder
     db_marka.marka_ad = marka.marka_ad.strip()
-    db.commit()
+    db.execute(bump_versions(Marka))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Böyle bir marka zaten mevcut.")
     db.refresh(db_marka)
-    db.close()
+    with brand_cache_lock:
+        brand_cache[db_marka.marka_id] = db_marka.marka_ad
     return db_marka
 
 # Marka Silme (DELETE)
 @app.delete("/markalar/{marka_id}")
-def delete_marka(marka_id: str):
-    db = SessionLocal()
-
+def delete_marka(marka_id: uuid.UUID, db: Session = Depends(get_db)):
     db_marka = db.query(Marka).filter(Marka.marka_id == marka_id).first()
     if not db_marka:
         raise HTTPException(status_code=404, detail="Marka bulunamadı")
     
+    # Markanın araçları da silindiğinden iki tablonun sayacı artar
     db.delete(db_marka)
+    db.execute(bump_versions(Marka, AracBilgileri))
     db.commit()
-    db.close()
+    with brand_cache_lock:
+        brand_cache.pop(marka_id, None)
     return {"message": "Marka başarıyla silindi"}
 
-# Araç Listeleme (GET)
-@app.get("/araclar/")
-def read_araclar():
-    db = SessionLocal()
-    araclar = db.query(AracBilgileri).all()
-    db.close()
-    return araclar
+# Araç Listeleme (GET) - (createdTime, arac_id) sırasına göre imleçli sayfalama, isteğe bağlı aktiflik/seri/renk filtresi
+# ve fields= ile yalnızca istenen sütunlar
+@app.get("/araclar/", response_model=AracPage, response_model_exclude_unset=True)
+def read_araclar(request: Request, response: Response, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, active: Optional[bool] = None, seri: Optional[str] = None, renk: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    fields = parse_fields(fields, AracRead)
+    headers, not_modified = conditional_headers(db, request, AracBilgileri)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    return list_response(page_araclar(db, [], limit, cursor, active, seri, renk, fields), headers)
+
+# Marka Araçları (GET) - tek markanın araçları, /araclar/ ile aynı sıralama ve sayfalama
+@app.get("/markalar/{marka_id}/araclar", response_model=AracPage, response_model_exclude_unset=True)
+def read_marka_araclar(marka_id: uuid.UUID, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, active: Optional[bool] = None, seri: Optional[str] = None, renk: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    fields = parse_fields(fields, AracRead)
+    if not existing_marka_ids(db, {marka_id}):
+        raise HTTPException(status_code=404, detail="Marka bulunamadı")
+    return list_response(page_araclar(db, [AracBilgileri.marka_id == marka_id], limit, cursor, active, seri, renk, fields), {})
 
-# Araç Ekleme (POST)
-@app.post("/araclar/")
-def create_arac(arac: AracBilgileriCreate):
-    db = SessionLocal()
+# Araç Facet'leri (GET) - özet tablodan yakıt, durum, marka ve yıl aralığı sayıları
+@app.get("/araclar/facets")
+def read_facets(db: Session = Depends(get_db)):
+    return read_facet_counts(db)
 
-    # 1. "marka_id" doğruluğunu kontrol et
-    marka = db.query(Marka).filter(Marka.marka_id == arac.marka_id).first()
-    if not marka:
-        db.close()
+# Araç Ekleme (POST)
+@app.post("/araclar/", response_model=AracRead)
+def create_arac(arac: AracBilgileriCreate, db: Session = Depends(get_db)):
+    # 1. "marka_id" doğruluğunu kontrol et (marka önbelleğinden)
+    if not existing_marka_ids(db, {arac.marka_id}):
         raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
 
-    # 2-6. Girilen değerlerdeki boşlukları temizle
-    arac.seri = arac.seri.strip()
-    arac.renk = arac.renk.strip()
-    arac.yakit_gucu = arac.yakit_gucu.strip()
-
-    # "yil" kontrolü - İçinde bulunduğumuz yıldan büyük olamaz, negatif olamaz
-    current_year = datetime.now().year
-    if arac.yil > current_year or arac.yil < 0:
-        db.close()
-        raise HTTPException(status_code=400, detail="Yıl değeri geçersiz. Yıl, içinde bulunduğumuz yıldan büyük veya negatif olamaz.")
-
-    # "kilometre" kontrolü - Negatif olamaz
-    if arac.kilometre < 0:
-        db.close()
-        raise HTTPException(status_code=400, detail="Kilometre değeri negatif olamaz.")
+    # 2-8. Boşlukları temizle, yıl ve kilometre değerlerini kontrol et
+    clean_arac(arac)
 
-    # Yeni araç kaydını oluştur
-    db_arac = AracBilgileri(**arac.dict())
+    # Yeni araç kaydını oluştur (seri ve renk arama tablolarından kimliğe çevrilir)
+    (values,) = arac_values(db, [arac])
+    if values is None:
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+    db_arac = AracBilgileri(**values)
     db.add(db_arac)
-    db.commit()
+    db.execute(bump_versions(AracBilgileri))
+    commit_arac(db, arac.marka_id)
     db.refresh(db_arac)
-    db.close()
     return db_arac
 
-# Araç Güncelleme (PUT)
-@app.put("/araclar/{arac_id}")
-def update_arac(arac_id: str, arac: AracBilgileriUpdate):
-    db = SessionLocal()
+# Toplu Araç Ekleme (POST) - tüm satırlar doğrulanır, geçerli olanlar tek işlemde toplu eklenir
+@app.post("/araclar/bulk")
+def create_araclar_bulk(records: List[dict] = Body(...), db: Session = Depends(get_db)):
+    return import_araclar(db, records)
 
-    # 1. "marka_id" doğruluğunu kontrol et
-    marka = db.query(Marka).filter(Marka.marka_id == arac.marka_id).first()
-    if not marka:
-        db.close()
+# Araç Güncelleme (PUT)
+@app.put("/araclar/{arac_id}", response_model=AracRead)
+def update_arac(arac_id: uuid.UUID, arac: AracBilgileriUpdate, db: Session = Depends(get_db)):
+    # 1. "marka_id" doğruluğunu kontrol et (marka önbelleğinden)
+    if not existing_marka_ids(db, {arac.marka_id}):
         raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
 
     db_arac = db.query(AracBilgileri).filter(AracBilgileri.arac_id == arac_id).first()
     if not db_arac:
-        db.close()
         raise HTTPException(status_code=404, detail="Araç bulunamadı")
 
-    # 2-6. Girilen değerlerdeki boşlukları temizle
-    arac.seri = arac.seri.strip()
-    arac.renk = arac.renk.strip()
-    arac.yakit_gucu = arac.yakit_gucu.strip()
-
-    # 7. "yil" kontrolü - İçinde bulunduğumuz yıldan büyük olamaz, negatif olamaz
-    current_year = datetime.now().year
-    if arac.yil > current_year or arac.yil < 0:
-        db.close()
-        raise HTTPException(status_code=400, detail="Yıl değeri geçersiz. Yıl, içinde bulunduğumuz yıldan büyük veya negatif olamaz.")
+    # 2-8. Boşlukları temizle, yıl ve kilometre değerlerini kontrol et
+    clean_arac(arac)
 
-    # 8. "kilometre" kontrolü - Negatif olamaz
-    if arac.kilometre < 0:
-        db.close()
-        raise HTTPException(status_code=400, detail="Kilometre değeri negatif olamaz.")
-
-    # Güncellemeleri uygula
-    db_arac.marka_id = arac.marka_id
-    db_arac.seri = arac.seri
-    db_arac.renk = arac.renk
-    db_arac.yil = arac.yil
-    db_arac.yakit = arac.yakit
-    db_arac.durum = arac.durum
-    db_arac.kilometre = arac.kilometre
-    db_arac.yakit_gucu = arac.yakit_gucu
-    db_arac.isActive = arac.isActive
+    # Güncellemeleri uygula (seri ve renk arama tablolarından kimliğe çevrilir)
+    (values,) = arac_values(db, [arac])
+    if values is None:
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+    for key, value in values.items():
+        setattr(db_arac, key, value)
 
-    db.commit()
+    db.execute(bump_versions(AracBilgileri))
+    commit_arac(db, arac.marka_id)
     db.refresh(db_arac)
-    db.close()
     return db_arac
 
 # Araç Silme (DELETE)
 @app.delete("/araclar/{arac_id}")
-def delete_arac(arac_id: str):
-    db = SessionLocal()
+def delete_arac(arac_id: uuid.UUID, db: Session = Depends(get_db)):
     db_arac = db.query(AracBilgileri).filter(AracBilgileri.arac_id == arac_id, AracBilgileri.isActive == False).first()
     if not db_arac:
         raise HTTPException(status_code=404, detail="Araç bulunamadı veya isActive durumu 'false' değil")
     db.delete(db_arac)
+    db.execute(bump_versions(AracBilgileri))
     db.commit()
-    db.close()
     return {"message": "Araç başarıyla silindi"}
 
-# Uygulamayı çalıştır
+# Uygulamayı çalıştır (ASYNC_DB=1 ile asyncio motorunu kullanan main13_async sürümü başlatılır);
+# "bootstrap" argümanıyla yalnızca veritabanı şeması oluşturulur
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if sys.argv[1:] == ["bootstrap"]:
+        bootstrap()
+        print("Veritabanı şeması oluşturuldu.")
+    else:
+        import uvicorn
+        if os.getenv("ASYNC_DB", "").lower() in ("1", "true", "yes"):
+            uvicorn.run("main13_async:app", host="127.0.0.1", port=8000)
+        else:
+            uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,260 @@
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, Body   # main13'ün asyncio motoru ile çalışan sürümü
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import uuid
+from main13 import (
+    Marka, AracBilgileri, MarkaCreate, MarkaUpdate, AracBilgileriCreate, AracBilgileriUpdate,
+    MarkaRead, AracRead, AracPage, MarkaPage, TimedPoolMixin,
+    POOL_SIZE, MAX_OVERFLOW, POOL_TIMEOUT, POOL_RECYCLE, POOL_PRE_PING, FACET_REFRESH_INTERVAL,
+    brand_cache, brand_cache_lock, load_brand_cache, existing_marka_ids,
+    clean_arac, arac_values, bump_versions, conditional_headers, parse_fields, page_araclar, markalar_page,
+    import_araclar, read_facet_counts, write_facets, pool_status, pool_timeout_handler, list_response,
+)
+
+# Async veritabanı bağlantı bilgileri (ör. postgresql+asyncpg://... ya da sqlite+aiosqlite:///...)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# Bağlantı alma süresini main13 ile aynı istatistiklere yazan async havuz
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Async motor ilk kullanımda oluşturulur; havuz ayarları main13 ile aynı ortam değişkenlerinden gelir
+async_engine = None
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+# Motoru oluştur (bir kez) ve oturumları ona bağla
+def get_async_engine():
+    global async_engine
+    if async_engine is None:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=POOL_PRE_PING,
+        )
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+# Facet tablosunu FACET_REFRESH_INTERVAL aralıklarla async motor üzerinden yenile; hata olursa bir sonraki tura bırakılır
+async def refresh_facets_periodically():
+    while True:
+        try:
+            async with get_async_engine().begin() as conn:
+                await conn.run_sync(write_facets)
+        except SQLAlchemyError:
+            pass
+        await asyncio.sleep(FACET_REFRESH_INTERVAL)
+
+# Uygulama açılırken motoru oluştur, marka önbelleğini doldur ve facet yenileyiciyi başlat;
+# kapanırken yenileyiciyi durdur ve bağlantıları kapat (şema main13.py bootstrap ile oluşturulur)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(load_brand_cache)
+
+    task = asyncio.create_task(refresh_facets_periodically()) if FACET_REFRESH_INTERVAL > 0 else None
+    yield
+    if task is not None:
+        task.cancel()
+    await async_engine.dispose()
+
+# FastAPI uygulaması. Uç noktalar ve yanıtlar main13 ile aynıdır: sorgular main13'teki ortak yardımcılarla
+# (run_sync üzerinden) kurulur, yanıtlar aynı okuma modellerinden geçer.
+app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+# Veritabanı oturumu: her istek için açılır, hata olsa da kapatılır
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Araç yazımını kaydet; marka önbellekten geçip başka bir işçide silinmişse yabancı anahtar reddeder
+async def commit_arac(db: AsyncSession, marka_id: uuid.UUID):
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        with brand_cache_lock:
+            brand_cache.pop(marka_id, None)
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+
+# Bağlantı havuzu durumu ve bekleme istatistikleri
+@app.get("/pool/stats")
+async def read_pool_stats():
+    return pool_status(get_async_engine().sync_engine.pool)
+
+# CRUD İşlemleri
+
+# Marka Ekleme (POST)
+@app.post("/markalar/", response_model=MarkaRead)
+async def create_marka(marka: MarkaCreate, db: AsyncSession = Depends(get_db)):
+    # Yeni marka kaydını oluştur; aynı isimde bir marka varsa marka_ad_normalized benzersiz indeksi reddeder
+    db_marka = Marka(marka_ad=marka.marka_ad.strip())
+    db.add(db_marka)
+    await db.execute(bump_versions(Marka))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Bu marka adı zaten mevcut.")
+    await db.refresh(db_marka)
+    with brand_cache_lock:
+        brand_cache[db_marka.marka_id] = db_marka.marka_ad
+    return db_marka
+
+# Marka Listeleme (GET) - marka_id sırasına göre imleçli sayfalama, include=araclar (marka başına en fazla
+# araclar_limit araç) ve fields= ile seyrek yanıt
+@app.get("/markalar/", response_model=MarkaPage, response_model_exclude_unset=True)
+async def read_markalar(request: Request, response: Response, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, include: Optional[str] = None, araclar_limit: int = Query(20, ge=1, le=100), fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    fields = parse_fields(fields, MarkaRead)
+    # include=araclar yanıtı araçları da içerdiğinden ETag araç tablosunun sürümünü de kapsar
+    models = [Marka, AracBilgileri] if include == "araclar" else [Marka]
+    headers, not_modified = await db.run_sync(conditional_headers, request, *models)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    return await db.run_sync(markalar_page, limit, cursor, include, araclar_limit, fields)
+
+# Marka Güncelleme (PUT)
+@app.put("/markalar/{marka_id}", response_model=MarkaRead)
+async def update_marka(marka_id: uuid.UUID, marka: MarkaUpdate, db: AsyncSession = Depends(get_db)):
+    # marka_id girildiğinde eksik veya hatalıysa hata mesajı döndür
+    db_marka = await db.get(Marka, marka_id)
+    if not db_marka:
+        raise HTTPException(status_code=400, detail="Marka ID hatalı veya eksik girdiniz.")
+
+    # Marka adını güncelle; aynı isimde başka bir marka varsa benzersiz indeks reddeder
+    db_marka.marka_ad = marka.marka_ad.strip()
+    await db.execute(bump_versions(Marka))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Böyle bir marka zaten mevcut.")
+    await db.refresh(db_marka)
+    with brand_cache_lock:
+        brand_cache[db_marka.marka_id] = db_marka.marka_ad
+    return db_marka
+
+# Marka Silme (DELETE)
+@app.delete("/markalar/{marka_id}")
+async def delete_marka(marka_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    # Cascade silme için araçlar önceden yüklenir (async oturumda tembel yükleme yapılamaz)
+    db_marka = await db.get(Marka, marka_id, options=[selectinload(Marka.araclar)])
+    if not db_marka:
+        raise HTTPException(status_code=404, detail="Marka bulunamadı")
+
+    await db.delete(db_marka)
+    await db.execute(bump_versions(Marka, AracBilgileri))
+    await db.commit()
+    with brand_cache_lock:
+        brand_cache.pop(marka_id, None)
+    return {"message": "Marka başarıyla silindi"}
+
+# Araç Listeleme (GET) - (createdTime, arac_id) sırasına göre imleçli sayfalama, isteğe bağlı aktiflik/seri/renk filtresi
+# ve fields= ile yalnızca istenen sütunlar
+@app.get("/araclar/", response_model=AracPage, response_model_exclude_unset=True)
+async def read_araclar(request: Request, response: Response, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, active: Optional[bool] = None, seri: Optional[str] = None, renk: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    fields = parse_fields(fields, AracRead)
+    headers, not_modified = await db.run_sync(conditional_headers, request, AracBilgileri)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    return list_response(await db.run_sync(page_araclar, [], limit, cursor, active, seri, renk, fields), headers)
+
+# Marka Araçları (GET) - tek markanın araçları, /araclar/ ile aynı sıralama ve sayfalama
+@app.get("/markalar/{marka_id}/araclar", response_model=AracPage, response_model_exclude_unset=True)
+async def read_marka_araclar(marka_id: uuid.UUID, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, active: Optional[bool] = None, seri: Optional[str] = None, renk: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    fields = parse_fields(fields, AracRead)
+    if not await db.run_sync(existing_marka_ids, {marka_id}):
+        raise HTTPException(status_code=404, detail="Marka bulunamadı")
+    return list_response(await db.run_sync(page_araclar, [AracBilgileri.marka_id == marka_id], limit, cursor, active, seri, renk, fields), {})
+
+# Araç Facet'leri (GET) - özet tablodan yakıt, durum, marka ve yıl aralığı sayıları
+@app.get("/araclar/facets")
+async def read_facets(db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(read_facet_counts)
+
+# Araç Ekleme (POST)
+@app.post("/araclar/", response_model=AracRead)
+async def create_arac(arac: AracBilgileriCreate, db: AsyncSession = Depends(get_db)):
+    # 1. "marka_id" doğruluğunu kontrol et (marka önbelleğinden)
+    if not await db.run_sync(existing_marka_ids, {arac.marka_id}):
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+
+    # 2-8. Boşlukları temizle, yıl ve kilometre değerlerini kontrol et
+    clean_arac(arac)
+
+    # Yeni araç kaydını oluştur (seri ve renk arama tablolarından kimliğe çevrilir)
+    (values,) = await db.run_sync(arac_values, [arac])
+    if values is None:
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+    db_arac = AracBilgileri(**values)
+    db.add(db_arac)
+    await db.execute(bump_versions(AracBilgileri))
+    await commit_arac(db, arac.marka_id)
+    await db.refresh(db_arac)
+    return db_arac
+
+# Toplu Araç Ekleme (POST) - tüm satırlar doğrulanır, geçerli olanlar tek işlemde toplu eklenir
+@app.post("/araclar/bulk")
+async def create_araclar_bulk(records: List[dict] = Body(...), db: AsyncSession = Depends(get_db)):
+    return await db.run_sync(import_araclar, records)
+
+# Araç Güncelleme (PUT)
+@app.put("/araclar/{arac_id}", response_model=AracRead)
+async def update_arac(arac_id: uuid.UUID, arac: AracBilgileriUpdate, db: AsyncSession = Depends(get_db)):
+    # 1. "marka_id" doğruluğunu kontrol et (marka önbelleğinden)
+    if not await db.run_sync(existing_marka_ids, {arac.marka_id}):
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+
+    db_arac = await db.get(AracBilgileri, arac_id)
+    if not db_arac:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı")
+
+    # 2-8. Boşlukları temizle, yıl ve kilometre değerlerini kontrol et
+    clean_arac(arac)
+
+    # Güncellemeleri uygula (seri ve renk arama tablolarından kimliğe çevrilir)
+    (values,) = await db.run_sync(arac_values, [arac])
+    if values is None:
+        raise HTTPException(status_code=400, detail="Marka ID eksik veya hatalı.")
+    for key, value in values.items():
+        setattr(db_arac, key, value)
+
+    await db.execute(bump_versions(AracBilgileri))
+    await commit_arac(db, arac.marka_id)
+    await db.refresh(db_arac)
+    return db_arac
+
+# Araç Silme (DELETE)
+@app.delete("/araclar/{arac_id}")
+async def delete_arac(arac_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    result = await db.scalars(
+        select(AracBilgileri).where(AracBilgileri.arac_id == arac_id, AracBilgileri.isActive == False)
+    )
+    db_arac = result.first()
+    if not db_arac:
+        raise HTTPException(status_code=404, detail="Araç bulunamadı veya isActive durumu 'false' değil")
+    await db.delete(db_arac)
+    await db.execute(bump_versions(AracBilgileri))
+    await db.commit()
+    return {"message": "Araç başarıyla silindi"}
+
+# Uygulamayı çalıştır
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=8000)
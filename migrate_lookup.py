@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine, text
+import os
+
+# Kullanım: DATABASE_URL=... python migrate_lookup.py
+# arac_bilgileri'deki metin seri/renk sütunlarını seriler/renkler arama tablolarına taşır ve
+# araçları seri_id/renk_id ile bağlar; PostgreSQL'de durum sütunu smallint'e çevrilir.
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+# Arama tablolarını oluştur, mevcut değerlerle doldur ve araçlara kimlikleri yaz
+COMMON_STEPS = [
+    "INSERT INTO renkler (renk_ad) SELECT DISTINCT renk FROM arac_bilgileri",
+    "INSERT INTO seriler (marka_id, seri_ad) SELECT DISTINCT marka_id, seri FROM arac_bilgileri",
+    "UPDATE arac_bilgileri SET "
+    "renk_id = (SELECT renk_id FROM renkler WHERE renkler.renk_ad = arac_bilgileri.renk), "
+    "seri_id = (SELECT seri_id FROM seriler WHERE seriler.marka_id = arac_bilgileri.marka_id "
+    "AND seriler.seri_ad = arac_bilgileri.seri)",
+]
+
+POSTGRESQL_STEPS = [
+    "CREATE TABLE IF NOT EXISTS renkler (renk_id SMALLSERIAL PRIMARY KEY, renk_ad VARCHAR NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS seriler (seri_id SERIAL PRIMARY KEY, "
+    "marka_id UUID NOT NULL REFERENCES markalar (marka_id) ON DELETE CASCADE, seri_ad VARCHAR NOT NULL, "
+    "CONSTRAINT uq_seriler_marka_id_seri_ad UNIQUE (marka_id, seri_ad))",
+    "ALTER TABLE arac_bilgileri ADD COLUMN seri_id INTEGER REFERENCES seriler (seri_id), "
+    "ADD COLUMN renk_id SMALLINT REFERENCES renkler (renk_id)",
+    *COMMON_STEPS,
+    "ALTER TABLE arac_bilgileri ALTER COLUMN seri_id SET NOT NULL, ALTER COLUMN renk_id SET NOT NULL, "
+    "DROP COLUMN seri, DROP COLUMN renk, ALTER COLUMN durum TYPE smallint USING durum::smallint",
+    "CREATE INDEX IF NOT EXISTS ix_arac_bilgileri_seri_id ON arac_bilgileri (seri_id)",
+    "CREATE INDEX IF NOT EXISTS ix_arac_bilgileri_renk_id ON arac_bilgileri (renk_id)",
+]
+
+# SQLite: sütun tipi değiştirilemez, durum değerleri zaten tamsayı olarak karşılaştırılabilir (DROP COLUMN için 3.35+)
+SQLITE_STEPS = [
+    "CREATE TABLE IF NOT EXISTS renkler (renk_id INTEGER PRIMARY KEY, renk_ad VARCHAR NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS seriler (seri_id INTEGER PRIMARY KEY, "
+    "marka_id CHAR(32) NOT NULL REFERENCES markalar (marka_id) ON DELETE CASCADE, seri_ad VARCHAR NOT NULL, "
+    "CONSTRAINT uq_seriler_marka_id_seri_ad UNIQUE (marka_id, seri_ad))",
+    "ALTER TABLE arac_bilgileri ADD COLUMN seri_id INTEGER REFERENCES seriler (seri_id)",
+    "ALTER TABLE arac_bilgileri ADD COLUMN renk_id SMALLINT REFERENCES renkler (renk_id)",
+    *COMMON_STEPS,
+    "ALTER TABLE arac_bilgileri DROP COLUMN seri",
+    "ALTER TABLE arac_bilgileri DROP COLUMN renk",
+    "CREATE INDEX IF NOT EXISTS ix_arac_bilgileri_seri_id ON arac_bilgileri (seri_id)",
+    "CREATE INDEX IF NOT EXISTS ix_arac_bilgileri_renk_id ON arac_bilgileri (renk_id)",
+]
+
+# Tüm adımları tek işlemde uygula; bir adım başarısız olursa hiçbir değişiklik kalmaz
+def migrate(engine):
+    steps = POSTGRESQL_STEPS if engine.dialect.name == "postgresql" else SQLITE_STEPS
+    with engine.begin() as conn:
+        for step in steps:
+            conn.execute(text(step))
+
+if __name__ == "__main__":
+    migrate(create_engine(DATABASE_URL))
+    print("seri ve renk değerleri arama tablolarına taşındı.")
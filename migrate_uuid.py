@@ -0,0 +1,34 @@
+from sqlalchemy import create_engine, text
+import os
+
+# Kullanım: DATABASE_URL=... python migrate_uuid.py
+# main13'ün String (36 karakter uuid4 metni) olarak tutulan marka_id/arac_id sütunlarını Uuid tipine taşır.
+# Eski kimlikler geçerli UUID olduğundan olduğu gibi korunur; yeni kayıtlar zaman sıralı UUIDv7 alır.
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+# PostgreSQL: sütunları yerinde 16 baytlık yerel uuid tipine çevir (yabancı anahtar geçici olarak kaldırılır)
+POSTGRESQL_STEPS = [
+    "ALTER TABLE arac_bilgileri DROP CONSTRAINT IF EXISTS arac_bilgileri_marka_id_fkey",
+    "ALTER TABLE markalar ALTER COLUMN marka_id TYPE uuid USING marka_id::uuid",
+    "ALTER TABLE arac_bilgileri ALTER COLUMN arac_id TYPE uuid USING arac_id::uuid, "
+    "ALTER COLUMN marka_id TYPE uuid USING marka_id::uuid",
+    "ALTER TABLE arac_bilgileri ADD CONSTRAINT arac_bilgileri_marka_id_fkey "
+    "FOREIGN KEY (marka_id) REFERENCES markalar (marka_id) ON DELETE CASCADE",
+]
+
+# SQLite: yerel UUID tipi yok, SQLAlchemy Uuid tipi tiresiz 32 karakterlik metin bekler
+SQLITE_STEPS = [
+    "UPDATE markalar SET marka_id = lower(replace(marka_id, '-', ''))",
+    "UPDATE arac_bilgileri SET arac_id = lower(replace(arac_id, '-', '')), marka_id = lower(replace(marka_id, '-', ''))",
+]
+
+# Tüm adımları tek işlemde uygula; bir adım başarısız olursa hiçbir değişiklik kalmaz
+def migrate(engine):
+    steps = POSTGRESQL_STEPS if engine.dialect.name == "postgresql" else SQLITE_STEPS
+    with engine.begin() as conn:
+        for step in steps:
+            conn.execute(text(step))
+
+if __name__ == "__main__":
+    migrate(create_engine(DATABASE_URL))
+    print("marka_id ve arac_id sütunları Uuid tipine taşındı.")
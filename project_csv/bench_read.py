@@ -0,0 +1,41 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from crud import CSV_HEADER, read_csv_file, read_csv_rows
+
+# Ölçüm için üretilecek satır sayısı (komut satırından verilebilir)
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+# Geçici bir CSV dosyasına örnek araçlar yaz
+def create_sample_file(path: str, rows: int):
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for i in range(rows):
+            writer.writerow([i, f"Marka{i % 50}", f"Seri{i % 300}", "beyaz", 2000 + i % 25, "dizel", "ikinci_el", i * 7 % 300_000, 90 + i % 200])
+
+# Okuma fonksiyonunu çalıştır; saniyedeki satır sayısını ve en yüksek bellek kullanımını (MB) döndür
+def measure(read, path: str):
+    start = time.perf_counter()
+    araclar = read(path)
+    elapsed = time.perf_counter() - start
+    del araclar
+
+    tracemalloc.start()
+    araclar = read(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(araclar) / elapsed, peak / 1024 / 1024
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "araclar.csv")
+        create_sample_file(path, ROWS)
+        validated, validated_mb = measure(read_csv_file, path)
+        trusted, trusted_mb = measure(read_csv_rows, path)
+    print(f"{ROWS} satır")
+    print(f"read_csv_file (DictReader + pydantic): {validated:10,.0f} satır/sn, {validated_mb:7.1f} MB")
+    print(f"read_csv_rows (csv.reader + AracRow) : {trusted:10,.0f} satır/sn, {trusted_mb:7.1f} MB ({trusted / validated:.1f}x)")
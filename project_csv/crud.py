@@ -1,42 +1,437 @@
 import csv
+import io
+import json
+import mmap
 import os
-from typing import List
-from project_csv.models import Arac
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from models import Arac, AracRow
 
 # CSV dosyasının adı
 CSV_FILE = "araclar.csv"
 
+# CSV başlık satırı
+CSV_HEADER = ['id', 'marka', 'seri', 'renk', 'yil', 'yakit', 'durum', 'kilometre', 'motor_gucu']
+
+# Akış (streaming) yanıtlarında bir parçada biriktirilecek yaklaşık bayt sayısı
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Güncelleme/silme kayıtlarının eklendiği değişiklik günlüğü (write-ahead log)
+LOG_FILE = CSV_FILE + ".log"
+
+# Günlük bu boyutu (bayt) aşınca arka planda ana CSV dosyasına katlanır
+COMPACT_THRESHOLD = 1024 * 1024
+
+# id -> (bayt ofseti, uzunluk) indeksinin tutulduğu yan dosya
+INDEX_FILE = CSV_FILE + ".idx"
+
+# Yan dosya düzeni: başlıkta indekslenen CSV'nin (inode, mtime, kapsanan boyut) damgası, ardından sabit boyutlu kayıtlar
+_INDEX_HEADER = struct.Struct("<qqq")
+_INDEX_ENTRY = struct.Struct("<qqi")
+
+# Süreç içi önbellek: id -> AracRow (dosya sırası korunur)
+_cache: Dict[int, AracRow] = {}
+
+# Önbelleğin yüklendiği andaki dosya damgası (CSV ve günlük için mtime, boyut)
+_cache_stamp: Optional[tuple] = None
+
+# Günlükten okunan değişiklikler: id -> güncel AracRow, silinmişse None
+_overlay: Dict[int, Optional[AracRow]] = {}
+_overlay_stamp: Optional[tuple] = None
+
+# Yazma işlemleri ve arka plan sıkıştırması için kilit
+_lock = threading.RLock()
+_compactor: Optional[threading.Thread] = None
+
+# Bellekteki ofset indeksi ve indekslenen CSV dosyasının (inode, mtime, kapsanan boyut) damgası
+_offsets: Dict[int, Tuple[int, int]] = {}
+_offsets_stamp: Optional[Tuple[int, int, int]] = None
+
+# Arac (ya da AracRow) nesnesini CSV satırına çevir
+def arac_to_row(arac: Union[Arac, AracRow]) -> list:
+    return [arac.id, arac.marka, arac.seri, arac.renk, arac.yil, arac.yakit, arac.durum, arac.kilometre, arac.motor_gucu]
+
+# Günlük dosyasının (mtime, boyut) damgası, dosya yoksa (0, 0)
+def log_stamp() -> tuple:
+    if not os.path.exists(LOG_FILE):
+        return (0, 0)
+    stat = os.stat(LOG_FILE)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Verinin değişip değişmediğini anlamak için CSV ve günlüğün (mtime, boyut) damgası
+def file_stamp() -> tuple:
+    stat = os.stat(CSV_FILE)
+    return (stat.st_mtime_ns, stat.st_size) + log_stamp()
+
 # CSV dosyasını oluştur
 def create_csv_file():
     if not os.path.exists(CSV_FILE):
         with open(CSV_FILE, mode='w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
-            writer.writerow(['id', 'marka', 'seri', 'renk', 'yil', 'yakit', 'durum', 'kilometre', 'motor_gucu'])
+            writer.writerow(CSV_HEADER)
 
-# CSV dosyasını oku
-def read_csv_file() -> List[Arac]:
+# Sütun sırasıyla okunan CSV satırını sayısal alanları çevirerek AracRow'a dönüştür
+def decode_row(row: list) -> AracRow:
+    id, marka, seri, renk, yil, yakit, durum, kilometre, motor_gucu = row
+    return AracRow(int(id), marka, seri, renk, int(yil), yakit, durum, int(kilometre), int(motor_gucu))
+
+# Doğrulanmış Arac nesnesini önbellekte tutulan AracRow'a çevir
+def to_arac_row(arac: Union[Arac, AracRow]) -> AracRow:
+    return AracRow(*arac_to_row(arac))
+
+# Dışarıdan gelen bir CSV dosyasını her satırı pydantic ile doğrulayarak oku
+def read_csv_file(path: str = CSV_FILE) -> List[Arac]:
     araclar = []
-    with open(CSV_FILE, mode='r', newline='', encoding='utf-8') as file:
+    with open(path, mode='r', newline='', encoding='utf-8') as file:
         reader = csv.DictReader(file)
         for row in reader:
-            arac = Arac(
-                id=int(row['id']),
-                marka=row['marka'],
-                seri=row['seri'],
-                renk=row['renk'],
-                yil=int(row['yil']),
-                yakit=row['yakit'],
-                durum=row['durum'],
-                kilometre=int(row['kilometre']),
-                motor_gucu=int(row['motor_gucu'])
-            )
-            araclar.append(arac)
+            araclar.append(Arac(**row))
     return araclar
 
-# CSV dosyasına yaz
-def write_csv_file(araclar: List[Arac]):
-    with open(CSV_FILE, mode='w', newline='', encoding='utf-8') as file:
+# Uygulamanın kendi yazdığı CSV dosyasını hızlı oku: konumsal okuma, doğrulama yok, satır başına tek tuple
+def read_csv_rows(path: str = CSV_FILE) -> List[AracRow]:
+    with open(path, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        return [decode_row(row) for row in reader if row]
+
+# Dizindeki ad değişikliğini (os.replace) diske indir; Windows'ta dizin açılamadığından atlanır
+def _fsync_dir(path: str):
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# Araçları CSV_FILE yanında geçici bir dosyaya yaz ve fsync et; dosyanın adını döndür
+def _write_tmp_csv(araclar: List[Union[Arac, AracRow]]) -> str:
+    tmp_file = f"{CSV_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, mode='w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        writer.writerow(['id', 'marka', 'seri', 'renk', 'yil', 'yakit', 'durum', 'kilometre', 'motor_gucu'])
+        writer.writerow(CSV_HEADER)
         for arac in araclar:
-            writer.writerow([arac.id, arac.marka, arac.seri, arac.renk, arac.yil, arac.yakit, arac.durum, arac.kilometre, arac.motor_gucu])
\ No newline at end of file
+            writer.writerow(arac_to_row(arac))
+        file.flush()
+        os.fsync(file.fileno())
+    return tmp_file
+
+# Geçici dosyayı CSV_FILE yerine koy ve günlüğü log_tail ile değiştir (boşsa siler).
+# Sıra önemli: yeni CSV ve dizin kaydı diske inmeden günlük silinmez, çökmede katlanan değişiklikler kaybolmaz.
+def _install_csv(tmp_file: str, log_tail: bytes = b""):
+    os.replace(tmp_file, CSV_FILE)
+    _fsync_dir(CSV_FILE)
+    if log_tail:
+        tmp_log = LOG_FILE + ".tmp"
+        with open(tmp_log, mode='wb') as file:
+            file.write(log_tail)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_log, LOG_FILE)
+    elif os.path.exists(LOG_FILE):
+        os.remove(LOG_FILE)
+    _fsync_dir(LOG_FILE)
+    reset_offset_index()
+
+# CSV dosyasına yaz (verilen liste güncel görünüm olduğundan günlük de temizlenir)
+def write_csv_file(araclar: List[Union[Arac, AracRow]]):
+    global _cache, _cache_stamp, _overlay, _overlay_stamp
+    with _lock:
+        _install_csv(_write_tmp_csv(araclar))
+        _overlay = {}
+        _overlay_stamp = log_stamp()
+        _cache = {arac.id: to_arac_row(arac) for arac in araclar}
+        _cache_stamp = file_stamp()
+
+# Günlükteki değişiklikleri getir, günlük değiştiyse yeniden oku
+def get_overlay() -> Dict[int, Optional[AracRow]]:
+    global _overlay, _overlay_stamp
+    stamp = log_stamp()
+    if stamp != _overlay_stamp:
+        overlay = {}
+        if os.path.exists(LOG_FILE):
+            with open(LOG_FILE, mode='r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry["op"] == "delete":
+                        overlay[entry["id"]] = None
+                    else:
+                        overlay[entry["id"]] = AracRow(**entry["arac"])
+        _overlay = overlay
+        _overlay_stamp = stamp
+    return _overlay
+
+# id -> AracRow indeksini getir, dosyalar değiştiyse (mtime/boyut) CSV + günlük olarak yeniden yükle
+def get_arac_index() -> Dict[int, AracRow]:
+    global _cache, _cache_stamp
+    with _lock:
+        stamp = file_stamp()
+        if stamp != _cache_stamp:
+            cache = {arac.id: arac for arac in read_csv_rows()}
+            for arac_id, arac in get_overlay().items():
+                if arac is None:
+                    cache.pop(arac_id, None)
+                else:
+                    cache[arac_id] = arac
+            _cache = cache
+            _cache_stamp = stamp
+        return _cache
+
+# Önbellekteki tüm araçları getir
+def get_araclar() -> List[AracRow]:
+    return list(get_arac_index().values())
+
+# Tek bir aracı id ile getir
+def get_arac(arac_id: int) -> Optional[AracRow]:
+    return get_arac_index().get(arac_id)
+
+# Yeni araçları CSV sonuna, güncelleme/silmeleri günlüğe tek seferde yaz.
+# changes: (id, güncel Arac) ya da silme için (id, None); her dosya için tek yazım ve tek fsync yapılır
+def apply_changes(new_araclar: List[Arac], changes: List[Tuple[int, Optional[Arac]]]):
+    global _cache_stamp, _overlay_stamp
+    with _lock:
+        index = get_arac_index()
+        overlay = get_overlay()
+        if new_araclar:
+            with open(CSV_FILE, mode='a', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerows(arac_to_row(arac) for arac in new_araclar)
+                file.flush()
+                os.fsync(file.fileno())
+        if changes:
+            lines = []
+            for arac_id, arac in changes:
+                if arac is None:
+                    entry = {"op": "delete", "id": arac_id}
+                else:
+                    entry = {"op": "update", "id": arac_id, "arac": dict(zip(CSV_HEADER, arac_to_row(arac)))}
+                lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+            with open(LOG_FILE, mode='a', encoding='utf-8') as file:
+                file.write("".join(lines))
+                file.flush()
+                os.fsync(file.fileno())
+
+        for arac in new_araclar:
+            index[arac.id] = to_arac_row(arac)
+        for arac_id, arac in changes:
+            if arac is None:
+                overlay[arac_id] = None
+                index.pop(arac_id, None)
+            else:
+                overlay[arac_id] = index[arac_id] = to_arac_row(arac)
+        _overlay_stamp = log_stamp()
+        _cache_stamp = file_stamp()
+    if changes:
+        maybe_compact()
+
+# Günlüğü ana CSV dosyasına katla. Yeni dosya kilit dışında yazılır, okumalar ve yazımlar beklemez;
+# yalnızca yer değiştirme kilit altında yapılır. Bu arada CSV'ye eklenen satırlar yeni dosyanın sonuna,
+# günlüğe eklenen kayıtlar yeni günlüğe taşınır.
+def compact():
+    global _cache_stamp, _overlay_stamp
+    with _lock:
+        if not os.path.exists(LOG_FILE):
+            return
+        araclar = get_araclar()
+        csv_stat = os.stat(CSV_FILE)
+        log_stat = os.stat(LOG_FILE)
+
+    tmp_file = _write_tmp_csv(araclar)
+
+    with _lock:
+        # Dosyalar bu arada başka bir yoldan baştan yazıldıysa kuyruklar anlamsızdır; bu tur bırakılır
+        if (os.stat(CSV_FILE).st_ino != csv_stat.st_ino or not os.path.exists(LOG_FILE)
+                or os.stat(LOG_FILE).st_ino != log_stat.st_ino):
+            os.remove(tmp_file)
+            return
+        get_arac_index()
+        with open(CSV_FILE, mode='rb') as file:
+            file.seek(csv_stat.st_size)
+            csv_tail = file.read()
+        with open(LOG_FILE, mode='rb') as file:
+            file.seek(log_stat.st_size)
+            log_tail = file.read()
+        if csv_tail:
+            with open(tmp_file, mode='ab') as file:
+                file.write(csv_tail)
+                file.flush()
+                os.fsync(file.fileno())
+        _install_csv(tmp_file, log_tail)
+        # Önbellek içerik olarak zaten güncel; yalnızca damgalar yeni dosyalara göre yenilenir
+        _overlay_stamp = None
+        get_overlay()
+        _cache_stamp = file_stamp()
+
+# Günlük eşik değerini aştıysa sıkıştırmayı arka planda başlat
+def maybe_compact():
+    global _compactor
+    if log_stamp()[1] < COMPACT_THRESHOLD:
+        return
+    if _compactor is not None and _compactor.is_alive():
+        return
+    _compactor = threading.Thread(target=compact, daemon=True)
+    _compactor.start()
+
+# Ofset indeksini geçersiz kıl (dosya baştan yazıldığında çağrılır)
+def reset_offset_index():
+    global _offsets, _offsets_stamp
+    _offsets = {}
+    _offsets_stamp = None
+    if os.path.exists(INDEX_FILE):
+        os.remove(INDEX_FILE)
+
+# mmap üzerinde [start, end) aralığındaki tam kayıtları tara; (id, ofset, uzunluk) listesini ve son tam kaydın
+# bittiği konumu döndür. csv.writer satır sonu içeren alanları tırnak içinde çok satırlı yazar: tırnak sayısı tek
+# kaldıkça kayıt sonraki satırda sürer. id'si okunamayan kayıt atlanır, diğer kayıtların indekslenmesini bozmaz.
+def _scan_records(mm: mmap.mmap, start: int, end: int) -> Tuple[List[Tuple[int, int, int]], int]:
+    entries = []
+    pos = start
+    while pos < end:
+        quotes = 0
+        line_start = pos
+        while True:
+            newline = mm.find(b"\n", line_start, end)
+            if newline == -1:
+                return entries, pos
+            quotes += mm[line_start:newline].count(b'"')
+            if quotes % 2 == 0:
+                break
+            line_start = newline + 1
+        record = mm[pos:newline].rstrip(b"\r")
+        if record:
+            try:
+                entries.append((int(record.split(b",", 1)[0]), pos, len(record)))
+            except ValueError:
+                pass
+        pos = newline + 1
+    return entries, pos
+
+# Yan dosyadaki kayıtları belleğe yükle
+def _load_index_file() -> Tuple[Dict[int, Tuple[int, int]], Optional[Tuple[int, int, int]]]:
+    offsets = {}
+    with open(INDEX_FILE, mode='rb') as file:
+        data = file.read()
+    # Eksik ya da eski düzendeki yan dosya yok sayılır, indeks baştan kurulur
+    if len(data) < _INDEX_HEADER.size or (len(data) - _INDEX_HEADER.size) % _INDEX_ENTRY.size:
+        return offsets, None
+    stamp = _INDEX_HEADER.unpack_from(data, 0)
+    for arac_id, offset, length in _INDEX_ENTRY.iter_unpack(data[_INDEX_HEADER.size:]):
+        offsets[arac_id] = (offset, length)
+    return offsets, stamp
+
+# İndekslenen dosyaya yalnızca ekleme yapılıp yapılmadığı: aynı inode, daha büyük boyut ve
+# kapsanan kısım hâlâ satır sonunda bitiyor. Aynı boyutta farklı mtime ya da başka bir dosya baştan taranır.
+def _is_append(stamp: Optional[Tuple[int, int, int]], inode: int, size: int, mm: mmap.mmap) -> bool:
+    if stamp is None:
+        return False
+    indexed_inode, _, covered = stamp
+    return indexed_inode == inode and covered < size and (covered == 0 or mm[covered - 1:covered] == b"\n")
+
+# id -> (ofset, uzunluk) indeksini getir; dosyaya yalnızca eklenmişse sadece yeni kuyruğu tara
+def get_offset_index() -> Dict[int, Tuple[int, int]]:
+    global _offsets, _offsets_stamp
+    with _lock:
+        stat = os.stat(CSV_FILE)
+        if _offsets_stamp == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return _offsets
+        if _offsets_stamp is None and os.path.exists(INDEX_FILE):
+            _offsets, _offsets_stamp = _load_index_file()
+            if _offsets_stamp == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                return _offsets
+
+        with open(CSV_FILE, mode='rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            stat = os.fstat(file.fileno())
+            csv_size = len(mm)
+            if not _is_append(_offsets_stamp, stat.st_ino, csv_size, mm):
+                reset_offset_index()
+            start = _offsets_stamp[2] if _offsets_stamp else mm.find(b"\n") + 1
+            entries, covered = _scan_records(mm, start, csv_size)
+
+        if not os.path.exists(INDEX_FILE):
+            with open(INDEX_FILE, mode='wb') as file:
+                file.write(_INDEX_HEADER.pack(0, 0, 0))
+        with open(INDEX_FILE, mode='r+b') as file:
+            file.seek(0, os.SEEK_END)
+            for arac_id, offset, length in entries:
+                _offsets[arac_id] = (offset, length)
+                file.write(_INDEX_ENTRY.pack(arac_id, offset, length))
+            file.seek(0)
+            file.write(_INDEX_HEADER.pack(stat.st_ino, stat.st_mtime_ns, covered))
+        _offsets_stamp = (stat.st_ino, stat.st_mtime_ns, covered)
+        return _offsets
+
+# Tek bir aracı mmap üzerinden yalnızca kendi kaydını ayrıştırarak oku. Okunan kaydın id'si istenenle
+# eşleşmezse dosya indeksin dışında yeniden yazılmıştır; indeks baştan kurulup bir kez daha denenir,
+# yine okunamazsa tüm dosyayı yükleyen yavaş yola (get_arac) düşülür.
+def read_arac_at(arac_id: int) -> Optional[AracRow]:
+    with _lock:
+        overlay = get_overlay()
+        if arac_id in overlay:
+            return overlay[arac_id]
+        for _ in range(2):
+            entry = get_offset_index().get(arac_id)
+            if entry is None:
+                return None
+            offset, length = entry
+            with open(CSV_FILE, mode='rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                line = mm[offset:offset + length]
+            try:
+                arac = decode_row(next(csv.reader(io.StringIO(line.decode('utf-8'), newline='')), []))
+            except (ValueError, csv.Error):
+                arac = None
+            if arac is not None and arac.id == arac_id:
+                return arac
+            reset_offset_index()
+        return get_arac(arac_id)
+
+# CSV satırlarını günlükle birleştirerek tek tek oku (bellek kullanımı dosya boyutundan bağımsız)
+def iter_csv_rows() -> Iterator[list]:
+    overlay = dict(get_overlay())
+    with open(CSV_FILE, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            arac_id = int(row[0])
+            if arac_id in overlay:
+                arac = overlay.pop(arac_id)
+                if arac is not None:
+                    yield arac_to_row(arac)
+                continue
+            yield row
+    for arac in overlay.values():
+        if arac is not None:
+            yield arac_to_row(arac)
+
+# Satırları NDJSON olarak, yaklaşık STREAM_CHUNK_SIZE büyüklüğünde parçalar halinde üret
+def iter_ndjson() -> Iterator[str]:
+    lines = []
+    size = 0
+    for row in iter_csv_rows():
+        line = json.dumps(decode_row(row)._asdict(), ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines)
+
+# Satırları CSV metni olarak, yaklaşık STREAM_CHUNK_SIZE büyüklüğünde parçalar halinde üret
+def iter_csv_text() -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for row in iter_csv_rows():
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -1,7 +1,15 @@
-from fastapi import FastAPI, HTTPException
-from typing import List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import List, Optional
+import csv
+import io
+import json
 from models import Arac
-from crud import create_csv_file, read_csv_file, write_csv_file
+from crud import create_csv_file, get_araclar, read_arac_at, iter_ndjson, iter_csv_text
+from snapshot import search
+from writer import DuplicateIdError, NotFoundError, insert_arac, insert_many, update_arac, delete_arac
 
 app = FastAPI()
 
@@ -9,33 +17,131 @@ app = FastAPI()
 create_csv_file()
 
 @app.get("/cars/", response_model=List[Arac])
-def list_cars():
-    cars = read_csv_file()
+def list_cars(request: Request):
+    # Büyük listeler için akış modu: satırlar okundukça gönderilir
+    accept = request.headers.get("accept", "")
+    if "application/x-ndjson" in accept:
+        return StreamingResponse(iter_ndjson(), media_type="application/x-ndjson")
+    if "text/csv" in accept:
+        return StreamingResponse(iter_csv_text(), media_type="text/csv")
+
+    cars = [car._asdict() for car in get_araclar()]
     return cars
 
+@app.get("/cars/search", response_model=List[Arac])
+def search_cars(
+    yil_min: Optional[int] = None,
+    yil_max: Optional[int] = None,
+    kilometre_min: Optional[int] = None,
+    kilometre_max: Optional[int] = None,
+    motor_gucu_min: Optional[int] = None,
+    motor_gucu_max: Optional[int] = None,
+    yakit: Optional[str] = None,
+    durum: Optional[str] = None,
+    marka: Optional[str] = None,
+):
+    # Filtreler sütunlu anlık görüntü üzerinde vektörel karşılaştırmalarla uygulanır
+    return search(
+        ranges={
+            "yil": (yil_min, yil_max),
+            "kilometre": (kilometre_min, kilometre_max),
+            "motor_gucu": (motor_gucu_min, motor_gucu_max),
+        },
+        equals={"yakit": yakit, "durum": durum, "marka": marka},
+    )
+
+@app.get("/cars/{car_id}", response_model=Arac)
+def get_car(car_id: int):
+    car = read_arac_at(car_id)
+    if car is None:
+        raise HTTPException(status_code=404, detail="Car not found.")
+    return car._asdict()
+
 @app.post("/cars/")
 def add_car(car: Arac):
-    cars = read_csv_file()
-    for existing_car in cars:
-        if existing_car.id == car.id:
-            raise HTTPException(status_code=400, detail="A car with this ID already exists.")
-    cars.append(car)
-    write_csv_file(cars)
+    try:
+        insert_arac(car)
+    except DuplicateIdError:
+        raise HTTPException(status_code=400, detail="A car with this ID already exists.")
     return {"message": "Car successfully added."}
 
+# Doğrulama hatasını "alan: mesaj" biçiminde tek satıra indir
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+
+# CSV gövdesini satır sözlüklerine çevir; UTF-8 olmayan içerik istemci hatasıdır
+def parse_csv_records(data: bytes) -> List[dict]:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV body must be UTF-8 encoded.")
+    return list(csv.DictReader(io.StringIO(text)))
+
+# Gövdeyi ayrıştır, satırları doğrula ve geçerli olanları tek yazımda ekle. CPU yoğun olduğundan
+# olay döngüsünde değil iş parçacığı havuzunda çalışır, büyük yüklemeler diğer istekleri bekletmez.
+def import_cars(data: bytes, is_csv: bool) -> dict:
+    if is_csv:
+        records = parse_csv_records(data)
+    else:
+        try:
+            records = json.loads(data)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body.")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of cars.")
+
+    cars = []
+    rows = []
+    errors = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({"row": i, "error": "Expected an object."})
+            continue
+        # DictReader başlıktan fazla alanları None anahtarı altında toplar
+        if None in record:
+            errors.append({"row": i, "error": "Row has more fields than the header."})
+            continue
+        try:
+            cars.append(Arac(**record))
+            rows.append(i)
+        except ValidationError as error:
+            errors.append({"row": i, "error": format_validation_error(error)})
+        except TypeError as error:
+            errors.append({"row": i, "error": str(error)})
+
+    conflicts = insert_many(cars)
+    for i in conflicts:
+        errors.append({"row": rows[i], "error": "A car with this ID already exists."})
+    errors.sort(key=lambda error: error["row"])
+    return {"added": len(cars) - len(conflicts), "errors": errors}
+
+@app.post("/cars/bulk")
+async def add_cars_bulk(request: Request):
+    # Gövde JSON dizisi, ham CSV (text/csv) ya da "file" alanında yüklenmiş CSV olabilir;
+    # olay döngüsünde yalnızca gövde okunur
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        # Form alanları dosya değilse düz metin (str) olarak gelir
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'file' upload.")
+        data, is_csv = await upload.read(), True
+    else:
+        data, is_csv = await request.body(), content_type.startswith("text/csv")
+    return await run_in_threadpool(import_cars, data, is_csv)
+
 @app.delete("/cars/{car_id}")
-def delete_car(id: int):
-    cars = read_csv_file()
-    cars = [car for car in cars if car.id != id]
-    write_csv_file(cars)
+def delete_car(car_id: int):
+    delete_arac(car_id)
     return {"message": "Car successfully deleted."}
 
 @app.put("/cars/{car_id}")
-def update_car(id: int, updated_car: Arac):
-    cars = read_csv_file()
-    for i, car in enumerate(cars):
-        if car.id == id:
-            cars[i] = updated_car
-            write_csv_file(cars)
-            return {"message": "Car successfully updated."}
-    raise HTTPException(status_code=404, detail="Car not found.")
+def update_car(car_id: int, updated_car: Arac):
+    if updated_car.id != car_id:
+        raise HTTPException(status_code=400, detail="Car ID cannot be changed.")
+    try:
+        update_arac(updated_car)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Car not found.")
+    return {"message": "Car successfully updated."}
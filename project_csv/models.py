@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import NamedTuple
 
 # Veri modelini tanımla
 class Arac(BaseModel):
@@ -10,4 +11,16 @@ class Arac(BaseModel):
     yakit: str
     durum: str
     kilometre: int
-    motor_gucu: int
\ No newline at end of file
+    motor_gucu: int
+
+# Uygulamanın kendi yazdığı CSV satırları için hafif, doğrulamasız kayıt tipi
+class AracRow(NamedTuple):
+    id: int
+    marka: str
+    seri: str
+    renk: str
+    yil: int
+    yakit: str
+    durum: str
+    kilometre: int
+    motor_gucu: int
@@ -0,0 +1,294 @@
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+import crud
+from models import AracRow
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Anlık görüntü (snapshot) dosyasının adı
+SNAPSHOT_FILE = crud.CSV_FILE + ".snap"
+
+# Dosya düzeni: sihirli bayt + başlık uzunluğu + JSON başlık + sütun dizileri
+_MAGIC = b"ARACSNP1"
+_HEADER_LEN = struct.Struct("<I")
+
+# Sabit genişlikli sayısal sütunlar (int64) ve sözlükle kodlanan metin sütunları (int32 kod)
+NUMERIC_COLUMNS = ['id', 'yil', 'kilometre', 'motor_gucu']
+STRING_COLUMNS = ['marka', 'seri', 'renk', 'yakit', 'durum']
+
+# Sütunlar, sözlükler ve değer -> kod eşlemeleri
+Snapshot = Tuple[Dict[str, array], Dict[str, List[str]], Dict[str, Dict[str, int]]]
+
+# Bellekteki son anlık görüntü, id -> satır konumu ve görüntünün okuduğu kaynak:
+# (CSV inode, CSV'nin okunan boyutu, günlük inode, günlüğün okunan boyutu); günlük yoksa inode 0
+_snapshot: Optional[Snapshot] = None
+_positions: Dict[int, int] = {}
+_source: Optional[Tuple[int, int, int, int]] = None
+
+# Aynı anda gelen aramaların anlık görüntüyü birlikte yeniden oluşturmaması için kilit
+_lock = threading.Lock()
+
+# CSV ve günlük dosyasının şu anki (inode, boyut) bilgisi
+def read_source() -> Tuple[int, int, int, int]:
+    csv_stat = os.stat(crud.CSV_FILE)
+    try:
+        log_stat = os.stat(crud.LOG_FILE)
+    except FileNotFoundError:
+        return (csv_stat.st_ino, csv_stat.st_size, 0, 0)
+    return (csv_stat.st_ino, csv_stat.st_size, log_stat.st_ino, log_stat.st_size)
+
+# Dosyalara okunan kısımdan sonra yalnızca ekleme yapıldıysa (aynı inode, küçülmemiş boyut) kuyruklar uygulanabilir;
+# sıkıştırma ya da baştan yazma dosyaların inode'unu değiştirir ve tam yeniden oluşturma gerektirir
+def _is_append(source: Optional[Tuple[int, int, int, int]], current: Tuple[int, int, int, int]) -> bool:
+    if source is None:
+        return False
+    csv_inode, csv_size, log_inode, log_size = source
+    return (current[0] == csv_inode and current[1] >= csv_size
+            and (log_inode == 0 or (current[2] == log_inode and current[3] >= log_size)))
+
+# Araç listesini sütunlara ayır; tüm satırlar canlıdır
+def _read_columns(araclar: List[AracRow]) -> Snapshot:
+    columns = {name: array('q') for name in NUMERIC_COLUMNS}
+    columns.update({name: array('i') for name in STRING_COLUMNS})
+    dictionaries: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+    codes: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+
+    for arac in araclar:
+        for name in NUMERIC_COLUMNS:
+            columns[name].append(getattr(arac, name))
+        for name in STRING_COLUMNS:
+            value = getattr(arac, name)
+            code = codes[name].get(value)
+            if code is None:
+                code = codes[name][value] = len(dictionaries[name])
+                dictionaries[name].append(value)
+            columns[name].append(code)
+    columns['alive'] = array('b', b"\x01" * len(araclar))
+    return columns, dictionaries, codes
+
+# Anlık görüntüyü ve okuduğu kaynağı dosyaya yaz
+def _write_snapshot(snapshot: Snapshot, source: Tuple[int, int, int, int]):
+    columns, dictionaries, _ = snapshot
+    header = {
+        "source": list(source),
+        "rows": len(columns['id']),
+        "numeric": NUMERIC_COLUMNS,
+        "strings": {name: dictionaries[name] for name in STRING_COLUMNS},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+
+    # Geçici dosya adı süreç ve iş parçacığına özgüdür; başka bir yazıcının os.replace'i bu dosyayı götürmez
+    tmp_file = f"{SNAPSHOT_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, mode='wb') as file:
+        file.write(_MAGIC)
+        file.write(_HEADER_LEN.pack(len(header_bytes)))
+        file.write(header_bytes)
+        for name in NUMERIC_COLUMNS + STRING_COLUMNS:
+            column = columns[name]
+            if sys.byteorder != 'little':
+                column = array(column.typecode, column)
+                column.byteswap()
+            file.write(column.tobytes())
+    os.replace(tmp_file, SNAPSHOT_FILE)
+
+# Güncel görünümden ikili sütunlu anlık görüntüyü baştan oluştur ve dosyaya yaz. Görünüm ve kaynak bilgisi
+# aynı kilit altında alınır; böylece sonraki yenilemeler tam olarak bu noktadan sonraki kuyrukları uygular
+def build_snapshot() -> Tuple[Snapshot, Tuple[int, int, int, int]]:
+    with crud._lock:
+        source = read_source()
+        araclar = crud.get_araclar()
+    snapshot = _read_columns(araclar)
+    _write_snapshot(snapshot, source)
+    return snapshot, source
+
+# Anlık görüntüyü oku; sütunlar yerinde güncellenebilmesi için array olarak döner
+def load_snapshot() -> Tuple[dict, Snapshot]:
+    with open(SNAPSHOT_FILE, mode='rb') as file:
+        data = file.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError("Geçersiz anlık görüntü dosyası.")
+    pos = len(_MAGIC)
+    (header_len,) = _HEADER_LEN.unpack_from(data, pos)
+    pos += _HEADER_LEN.size
+    header = json.loads(data[pos:pos + header_len].decode('utf-8'))
+    pos += header_len
+
+    rows = header["rows"]
+    columns: Dict[str, array] = {}
+    for name, typecode in [(n, 'q') for n in NUMERIC_COLUMNS] + [(n, 'i') for n in STRING_COLUMNS]:
+        column = array(typecode)
+        size = rows * column.itemsize
+        column.frombytes(data[pos:pos + size])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        columns[name] = column
+        pos += size
+    columns['alive'] = array('b', b"\x01" * rows)
+    dictionaries = header["strings"]
+    codes = {name: {value: code for code, value in enumerate(values)} for name, values in dictionaries.items()}
+    return header, (columns, dictionaries, codes)
+
+# Kaynağın okunan kısmından sonra eklenen CSV satırlarını ve günlük kayıtlarını oku; yarım kalmış son kayıt
+# okunmaz, bir sonraki yenilemede okunur. Dönen kaynak, okunan kısmın sonunu gösterir.
+def _read_tails(source: Tuple[int, int, int, int]) -> Tuple[List[AracRow], List[Tuple[int, Optional[AracRow]]], Tuple[int, int, int, int]]:
+    with crud._lock:
+        current = read_source()
+        if not _is_append(source, current):
+            raise ValueError("Kaynak dosyalar baştan yazılmış.")
+        with open(crud.CSV_FILE, mode='rb') as file:
+            file.seek(source[1])
+            csv_tail = file.read(current[1] - source[1])
+        log_tail = b""
+        if current[2]:
+            log_start = source[3] if source[2] else 0
+            with open(crud.LOG_FILE, mode='rb') as file:
+                file.seek(log_start)
+                log_tail = file.read(current[3] - log_start)
+
+    _, csv_covered = crud._scan_records(csv_tail, 0, len(csv_tail))
+    reader = csv.reader(io.StringIO(csv_tail[:csv_covered].decode('utf-8'), newline=''))
+    new_araclar = [crud.decode_row(row) for row in reader if row]
+
+    log_covered = log_tail.rfind(b"\n") + 1
+    changes = []
+    for line in log_tail[:log_covered].decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        changes.append((entry["id"], None if entry["op"] == "delete" else AracRow(**entry["arac"])))
+
+    log_end = (source[3] if source[2] else 0) + log_covered
+    return new_araclar, changes, (current[0], source[1] + csv_covered, current[2], log_end)
+
+# Metin değerinin sözlük kodunu getir; yeni değer sözlüğün sonuna eklenir (eski kodlar değişmez)
+def _code(dictionaries: Dict[str, List[str]], codes: Dict[str, Dict[str, int]], name: str, value: str) -> int:
+    code = codes[name].get(value)
+    if code is None:
+        code = len(dictionaries[name])
+        dictionaries[name].append(value)
+        codes[name][value] = code
+    return code
+
+# Eklemeleri ve günlük değişikliklerini sütunların kopyasına uygula. Aramalar eski sütunları kilitsiz okumaya
+# devam edebildiğinden diziler yerinde değiştirilmez; kopya C düzeyinde tek bellek kopyasıdır, satır satır
+# yeniden oluşturmaya göre çok ucuzdur. Güncellenen araç satırı yerinde değişir, silinen satır ölü işaretlenir.
+def _apply_tails(snapshot: Snapshot, new_araclar: List[AracRow], changes: List[Tuple[int, Optional[AracRow]]]) -> Snapshot:
+    columns, dictionaries, codes = snapshot
+    columns = {name: column[:] for name, column in columns.items()}
+    for arac_id, arac in [(arac.id, arac) for arac in new_araclar] + changes:
+        pos = _positions.get(arac_id)
+        if arac is None:
+            if pos is not None:
+                columns['alive'][pos] = 0
+                del _positions[arac_id]
+            continue
+        if pos is None:
+            _positions[arac_id] = len(columns['id'])
+            for name in NUMERIC_COLUMNS:
+                columns[name].append(getattr(arac, name))
+            for name in STRING_COLUMNS:
+                columns[name].append(_code(dictionaries, codes, name, getattr(arac, name)))
+            columns['alive'].append(1)
+        else:
+            for name in NUMERIC_COLUMNS:
+                columns[name][pos] = getattr(arac, name)
+            for name in STRING_COLUMNS:
+                columns[name][pos] = _code(dictionaries, codes, name, getattr(arac, name))
+    return columns, dictionaries, codes
+
+# Anlık görüntüyü yeni sürümüyle değiştir; id -> satır konumu eşlemesi canlı satırlardan kurulur
+def _install(snapshot: Snapshot, source: Tuple[int, int, int, int]):
+    global _snapshot, _positions, _source
+    columns = snapshot[0]
+    _positions = {arac_id: pos for pos, arac_id in enumerate(columns['id']) if columns['alive'][pos]}
+    _snapshot = snapshot
+    _source = source
+
+# Güncel anlık görüntüyü getir. Dosyalara yalnızca ekleme yapıldıysa yeni CSV satırları ve günlük kayıtları
+# bellekteki sütunlara uygulanır; sıkıştırmadan sonra ya da kaynak okunamazsa baştan oluşturulur.
+def get_snapshot() -> Snapshot:
+    global _snapshot, _source
+    with _lock:
+        current = read_source()
+        if _snapshot is not None and _source == current:
+            return _snapshot
+
+        # Süreç yeni başladıysa diskteki anlık görüntü, okuduğu kaynak hâlâ geçerliyse başlangıç olarak kullanılır
+        if _snapshot is None and os.path.exists(SNAPSHOT_FILE):
+            try:
+                header, snapshot = load_snapshot()
+            except (ValueError, OSError):
+                header = None
+            if header is not None and _is_append(header.get("source"), current):
+                _install(snapshot, tuple(header["source"]))
+
+        if _snapshot is not None and _is_append(_source, current):
+            try:
+                new_araclar, changes, source = _read_tails(_source)
+                _snapshot = _apply_tails(_snapshot, new_araclar, changes)
+                _source = source
+                return _snapshot
+            except (ValueError, TypeError, KeyError, UnicodeDecodeError, csv.Error):
+                pass
+
+        _install(*build_snapshot())
+        return _snapshot
+
+# Sütunlar üzerinde aralık (min, max) ve eşitlik filtrelerini uygula, eşleşen canlı satırları döndür
+def search(ranges: Dict[str, Tuple[Optional[int], Optional[int]]], equals: Dict[str, Optional[str]]) -> List[dict]:
+    columns, dictionaries, value_codes = get_snapshot()
+    rows = len(columns['id'])
+
+    # Metin filtrelerini sözlük koduna çevir; sözlükte olmayan değer hiçbir satırla eşleşmez
+    codes = {}
+    for name, value in equals.items():
+        if value is None:
+            continue
+        if value not in value_codes[name]:
+            return []
+        codes[name] = value_codes[name][value]
+
+    if np is not None:
+        # array sütunları üzerinde kopyasız görünüm
+        views = {name: np.frombuffer(column, dtype=column.typecode, count=rows) for name, column in columns.items()}
+        mask = views['alive'] != 0
+        for name, (low, high) in ranges.items():
+            if low is not None:
+                mask &= views[name] >= low
+            if high is not None:
+                mask &= views[name] <= high
+        for name, code in codes.items():
+            mask &= views[name] == code
+        matches = np.flatnonzero(mask).tolist()
+    else:
+        matches = []
+        for i in range(rows):
+            if columns['alive'][i] and \
+                    all((low is None or columns[name][i] >= low) and (high is None or columns[name][i] <= high)
+                        for name, (low, high) in ranges.items()) and \
+                    all(columns[name][i] == code for name, code in codes.items()):
+                matches.append(i)
+
+    result = []
+    for i in matches:
+        record = {name: int(columns[name][i]) for name in NUMERIC_COLUMNS}
+        for name in STRING_COLUMNS:
+            record[name] = dictionaries[name][columns[name][i]]
+        result.append(record)
+    return result
+
+# Komut satırından çalıştırıldığında anlık görüntüyü baştan oluştur
+if __name__ == "__main__":
+    crud.create_csv_file()
+    (columns, _, _), _ = build_snapshot()
+    print(f"{SNAPSHOT_FILE}: {len(columns['id'])} araç")
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from models import Arac
+import crud
+
+# İlk değişiklikten sonra aynı yazıma katılacak diğer değişiklikler için beklenen süre (saniye)
+BATCH_WINDOW = 0.002
+
+# Tek yazımda uygulanacak en fazla değişiklik sayısı
+MAX_BATCH = 1000
+
+# Aynı id'ye sahip araç zaten varsa
+class DuplicateIdError(Exception):
+    pass
+
+# Güncellenecek araç bulunamazsa
+class NotFoundError(Exception):
+    pass
+
+# Kuyruktaki tek bir değişiklik isteği
+class _Mutation:
+    __slots__ = ("op", "arac_id", "arac", "araclar", "errors", "done", "error")
+
+    def __init__(self, op: str, arac_id: Optional[int], arac: Optional[Arac] = None, araclar: Optional[List[Arac]] = None):
+        self.op = op
+        self.arac_id = arac_id
+        self.arac = arac
+        self.araclar = araclar
+        self.errors: Dict[int, Exception] = {}
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+
+_queue: "queue.Queue[_Mutation]" = queue.Queue()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+
+# Kuyruktan ilk isteği bekle, ardından BATCH_WINDOW içinde gelenleri de topla
+def _collect_batch() -> List[_Mutation]:
+    batch = [_queue.get()]
+    deadline = time.monotonic() + BATCH_WINDOW
+    while len(batch) < MAX_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+# Toplu değişiklikleri sırayla doğrula ve tek seferde diske yaz
+def _apply_batch(batch: List[_Mutation]):
+    index = crud.get_arac_index()
+    overlay = crud.get_overlay()
+    exists: Dict[int, bool] = {}
+    touched: Set[int] = set()
+    new_araclar: List[Arac] = []
+    changes: List[Tuple[int, Optional[Arac]]] = []
+
+    # Ekleme kuralı: id varsa hata, yoksa yeni satır ya da günlük kaydı
+    def insert(arac: Arac) -> Optional[Exception]:
+        if exists.get(arac.id, arac.id in index):
+            return DuplicateIdError(arac.id)
+        # Günlükte ya da bu grupta geçmiş bir id, CSV'de tekrarlanmasın diye günlüğe yazılır
+        if arac.id in overlay or arac.id in touched:
+            changes.append((arac.id, arac))
+        else:
+            new_araclar.append(arac)
+        exists[arac.id] = True
+        touched.add(arac.id)
+        return None
+
+    for mutation in batch:
+        if mutation.op == "bulk":
+            for i, arac in enumerate(mutation.araclar):
+                error = insert(arac)
+                if error is not None:
+                    mutation.errors[i] = error
+            continue
+
+        arac_id = mutation.arac_id
+        present = exists.get(arac_id, arac_id in index)
+        if mutation.op == "insert":
+            mutation.error = insert(mutation.arac)
+            continue
+        if mutation.op == "update":
+            if not present:
+                mutation.error = NotFoundError(arac_id)
+                continue
+            changes.append((arac_id, mutation.arac))
+        elif present:
+            changes.append((arac_id, None))
+            exists[arac_id] = False
+        touched.add(arac_id)
+
+    try:
+        crud.apply_changes(new_araclar, changes)
+    except Exception as error:
+        for mutation in batch:
+            if mutation.error is None:
+                mutation.error = error
+
+# Tek yazıcı iş parçacığı: grupları sırayla uygular ve bekleyen çağıranları uyandırır
+def _run():
+    while True:
+        batch = _collect_batch()
+        try:
+            _apply_batch(batch)
+        except Exception as error:
+            for mutation in batch:
+                if mutation.error is None:
+                    mutation.error = error
+        for mutation in batch:
+            mutation.done.set()
+
+# Yazıcı iş parçacığını ilk kullanımda başlat
+def _ensure_started():
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, daemon=True)
+            _thread.start()
+
+# Değişikliği kuyruğa ekle ve diske yazılana kadar bekle
+def _submit(mutation: _Mutation):
+    _ensure_started()
+    _queue.put(mutation)
+    mutation.done.wait()
+    if mutation.error is not None:
+        raise mutation.error
+
+# Yeni araç ekle (id varsa DuplicateIdError)
+def insert_arac(arac: Arac):
+    _submit(_Mutation("insert", arac.id, arac))
+
+# Birden fazla aracı tek grupta ekle; çakışan id'ler için {sıra: DuplicateIdError} döner
+def insert_many(araclar: List[Arac]) -> Dict[int, Exception]:
+    mutation = _Mutation("bulk", None, araclar=araclar)
+    _submit(mutation)
+    return mutation.errors
+
+# Aracı güncelle (araç yoksa NotFoundError)
+def update_arac(arac: Arac):
+    _submit(_Mutation("update", arac.id, arac))
+
+# Aracı sil (araç yoksa bir şey yapılmaz)
+def delete_arac(arac_id: int):
+    _submit(_Mutation("delete", arac_id))
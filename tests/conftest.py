@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# main13 ayarlarını içe aktarılırken ortamdan okur: geçici bir SQLite veritabanı kullan, facet yenileyiciyi başlatma
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_main13.db')}")
+os.environ.setdefault("FACET_REFRESH_INTERVAL", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+import main13
+
+# Her test boş bir şemayla başlar
+@pytest.fixture
+def client():
+    main13.bootstrap()
+    with TestClient(main13.app) as client:
+        yield client
+    main13.Base.metadata.drop_all(bind=main13.get_engine())
+
+# Marka ekle, marka_id'yi döndür
+def create_marka(client, marka_ad: str) -> str:
+    response = client.post("/markalar/", json={"marka_ad": marka_ad})
+    assert response.status_code == 200, response.text
+    return response.json()["marka_id"]
+
+# Markaya count araç ekle (toplu uç nokta ile, hepsi aynı saniyede), eklenen arac_id'leri döndür
+def create_araclar(client, marka_id: str, count: int, **overrides) -> list:
+    records = [dict({"marka_id": marka_id, "seri": f"Seri{i % 3}", "renk": "beyaz", "yil": 2020, "yakit": 1, "durum": 2,
+                     "kilometre": i * 1000, "yakit_gucu": "150", "isActive": True}, **overrides) for i in range(count)]
+    response = client.post("/araclar/bulk", json=records)
+    assert response.status_code == 200, response.text
+    assert response.json()["errors"] == []
+    return response.json()["ids"]
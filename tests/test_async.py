@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+import httpx
+from fastapi.routing import APIRoute
+import main13
+
+pytest.importorskip("aiosqlite")
+import main13_async
+
+# Uç noktaların yol, yöntem ve sorgu parametreleri
+def route_signatures(app) -> dict:
+    return {(route.path, method): sorted(param.name for param in route.dependant.query_params)
+            for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+
+# Async sürüm sync sürümle aynı uç noktaları aynı sorgu parametreleriyle sunmalı
+def test_async_routes_match_sync():
+    assert route_signatures(main13_async.app) == route_signatures(main13.app)
+
+# Async sürüm, sync sürümle aynı yanıt şeklini ve özellikleri (ETag/304, fields=, filtreler, include=araclar,
+# toplu ekleme, facet'ler, havuz istatistikleri) sunmalı
+def test_async_responses_match_sync(client, monkeypatch):
+    monkeypatch.setattr(main13_async, "ASYNC_DATABASE_URL", main13.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"))
+    monkeypatch.setattr(main13_async, "async_engine", None)
+    arac = {"seri": "Egea", "renk": "mavi", "yil": 2020, "yakit": 1, "durum": 1, "kilometre": 5, "yakit_gucu": "90", "isActive": True}
+
+    async def run():
+        main13_async.get_async_engine()
+        transport = httpx.ASGITransport(app=main13_async.app)
+        responses = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            marka = (await async_client.post("/markalar/", json={"marka_ad": "Fiat"})).json()
+            responses["marka"] = marka
+            responses["arac"] = (await async_client.post("/araclar/", json=dict(arac, marka_id=marka["marka_id"]))).json()
+            responses["bulk"] = (await async_client.post("/araclar/bulk", json=[dict(arac, marka_id=marka["marka_id"], seri="Tipo", renk="kirmizi"),
+                                                                               dict(arac, marka_id=marka["marka_id"], yil=-1)])).json()
+            responses["markalar"] = (await async_client.get("/markalar/")).json()
+            araclar = await async_client.get("/araclar/")
+            responses["araclar"] = araclar.json()
+            responses["not_modified"] = (await async_client.get("/araclar/", headers={"If-None-Match": araclar.headers["etag"]})).status_code
+            responses["fields"] = (await async_client.get("/araclar/", params={"fields": "arac_id,seri"})).json()
+            responses["seri"] = (await async_client.get("/araclar/", params={"seri": "Tipo"})).json()
+            responses["renk"] = (await async_client.get(f"/markalar/{marka['marka_id']}/araclar", params={"renk": "kirmizi"})).json()
+            responses["include"] = (await async_client.get("/markalar/", params={"include": "araclar", "araclar_limit": 1})).json()
+            responses["facets"] = (await async_client.get("/araclar/facets")).json()
+            responses["pool"] = (await async_client.get("/pool/stats")).json()
+        await main13_async.async_engine.dispose()
+        return responses
+
+    responses = asyncio.run(run())
+    assert set(responses["marka"]) == set(responses["markalar"]["items"][0]) == set(main13.MarkaRead.model_fields)
+    assert set(responses["arac"]) == set(responses["araclar"]["items"][0]) == set(main13.AracRead.model_fields)
+    assert set(client.get("/araclar/").json()["items"][0]) == set(responses["arac"])
+
+    assert responses["bulk"]["added"] == 1 and [error["row"] for error in responses["bulk"]["errors"]] == [1]
+    assert responses["not_modified"] == 304
+    assert [set(item) for item in responses["fields"]["items"]] == [{"arac_id", "seri"}] * 2
+    assert [item["seri"] for item in responses["seri"]["items"]] == ["Tipo"]
+    assert [item["renk"] for item in responses["renk"]["items"]] == ["kirmizi"]
+    assert [len(item["araclar"]) for item in responses["include"]["items"]] == [1]
+    assert set(responses["facets"]) == set(client.get("/araclar/facets").json())
+    assert set(responses["pool"]) == set(client.get("/pool/stats").json())
@@ -0,0 +1,47 @@
+from sqlalchemy import select, update
+import main13
+from conftest import create_araclar, create_marka
+
+# Silinen araç en son modifiedTime'ı değiştirmez; If-Modified-Since ile eski liste 304 olarak dönmemeli
+def test_delete_is_not_hidden_by_if_modified_since(client):
+    marka_id = create_marka(client, "Toyota")
+    create_araclar(client, marka_id, 3)
+    (pasif_id,) = create_araclar(client, marka_id, 1, isActive=False)
+
+    first = client.get("/araclar/")
+    assert first.status_code == 200
+    assert client.get("/araclar/", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    assert client.delete(f"/araclar/{pasif_id}").status_code == 200
+
+    response = client.get("/araclar/", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+    assert client.get("/araclar/", headers={"If-None-Match": first.headers["etag"]}).status_code == 200
+
+# Güncelleme modifiedTime'ı değiştirmese bile (aynı saniye, işlem başlangıç zamanı) ETag yazım sayacıyla değişmeli
+def test_update_with_unchanged_modified_time_changes_etag(client):
+    marka_id = create_marka(client, "Toyota")
+    (arac_id,) = create_araclar(client, marka_id, 1)
+    engine = main13.get_engine()
+    with engine.connect() as conn:
+        modified = conn.execute(select(main13.AracBilgileri.arac_id, main13.AracBilgileri.modifiedTime)).all()
+        marka_modified = conn.scalar(select(main13.Marka.modifiedTime))
+
+    araclar_etag = client.get("/araclar/").headers["etag"]
+    markalar_etag = client.get("/markalar/").headers["etag"]
+
+    arac = client.get("/araclar/").json()["items"][0]
+    payload = {key: arac[key] for key in main13.AracBilgileriUpdate.model_fields}
+    payload["kilometre"] += 1
+    assert client.put(f"/araclar/{arac_id}", json=payload).status_code == 200
+    assert client.put(f"/markalar/{marka_id}", json={"marka_ad": "TOYOTA"}).status_code == 200
+
+    # Aynı saniyedeki yazımı taklit et: modifiedTime değerlerini güncellemeden önceki hallerine geri al
+    with engine.begin() as conn:
+        for row_id, value in modified:
+            conn.execute(update(main13.AracBilgileri).where(main13.AracBilgileri.arac_id == row_id).values(modifiedTime=value))
+        conn.execute(update(main13.Marka).values(modifiedTime=marka_modified))
+
+    assert client.get("/araclar/", headers={"If-None-Match": araclar_etag}).status_code == 200
+    assert client.get("/markalar/", headers={"If-None-Match": markalar_etag}).status_code == 200
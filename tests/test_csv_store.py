@@ -0,0 +1,217 @@
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import pytest
+
+# project_csv modülleri (crud, models, writer, snapshot) kendi dizininden üst düzey modül olarak içe aktarılır
+CSV_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_csv")
+sys.path.insert(0, CSV_DIR)
+
+from fastapi.testclient import TestClient
+import crud
+import snapshot
+import writer
+from models import Arac
+
+# Her test boş bir CSV ile geçici dizinde çalışır; modüllerin süreç içi durumu sıfırlanır
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name, value in [("_cache", {}), ("_cache_stamp", None), ("_overlay", {}), ("_overlay_stamp", None),
+                        ("_offsets", {}), ("_offsets_stamp", None), ("_compactor", None)]:
+        monkeypatch.setattr(crud, name, value)
+    monkeypatch.setattr(snapshot, "_snapshot", None)
+    monkeypatch.setattr(snapshot, "_positions", {})
+    monkeypatch.setattr(snapshot, "_source", None)
+    crud.create_csv_file()
+    yield tmp_path
+    if crud._compactor is not None:
+        crud._compactor.join()
+
+# project_csv uygulamalarını dosya yolundan ayrı adla yükle (main.py kökteki main.py ile karışmasın)
+def load_app(filename: str):
+    spec = importlib.util.spec_from_file_location(f"project_csv_{filename[:-3]}", os.path.join(CSV_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return TestClient(module.app)
+
+@pytest.fixture
+def client(store):
+    return load_app("main.py")
+
+def car(car_id: int, **overrides) -> dict:
+    return dict({"id": car_id, "marka": "Fiat", "seri": "Egea", "renk": "beyaz", "yil": 2020, "yakit": "benzin",
+                 "durum": "ikinci_el", "kilometre": car_id * 1000, "motor_gucu": 95}, **overrides)
+
+# Satır sonu içeren alan tırnaklı, çok satırlı bir kayıt olarak yazılır; ofset indeksi diğer kayıtları da bozmamalı
+def test_get_car_with_multiline_field(client):
+    assert client.post("/cars/", json=car(1)).status_code == 200
+    assert client.get("/cars/1").status_code == 200
+    assert client.post("/cars/", json=car(2, marka="Fi\nat", seri='"Tipo"\r\n2')).status_code == 200
+    assert client.post("/cars/", json=car(3)).status_code == 200
+
+    for car_id in (1, 2, 3):
+        response = client.get(f"/cars/{car_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["id"] == car_id
+    assert client.get("/cars/2").json()["marka"] == "Fi\nat"
+    assert client.get("/cars/2").json()["seri"] == '"Tipo"\r\n2'
+    assert client.get("/cars/4").status_code == 404
+
+# Güncelleme, silme ve sıkıştırmadan sonra tek araç okuması güncel görünümü döndürmeli
+def test_get_car_after_update_delete_and_compaction(client):
+    for car_id in range(1, 6):
+        client.post("/cars/", json=car(car_id))
+    assert client.get("/cars/2").json()["renk"] == "beyaz"
+
+    assert client.put("/cars/2", json=car(2, renk="kirmizi")).status_code == 200
+    assert client.delete("/cars/3").status_code == 200
+    assert client.get("/cars/2").json()["renk"] == "kirmizi"
+    assert client.get("/cars/3").status_code == 404
+
+    crud.compact()
+    assert not os.path.exists(crud.LOG_FILE)
+    assert client.get("/cars/2").json()["renk"] == "kirmizi"
+    assert client.get("/cars/3").status_code == 404
+    assert [client.get(f"/cars/{car_id}").json()["id"] for car_id in (1, 4, 5)] == [1, 4, 5]
+
+# Arka plan sıkıştırması yeni dosyayı yazarken gelen ekleme/güncelleme/silmeler kaybolmamalı
+def test_compaction_keeps_concurrent_writes(store, monkeypatch):
+    crud.apply_changes([Arac(**car(car_id)) for car_id in range(100)], [])
+    crud.apply_changes([], [(car_id, Arac(**car(car_id, renk="mavi"))) for car_id in range(10)] + [(car_id, None) for car_id in range(10, 20)])
+
+    write_tmp_csv = crud._write_tmp_csv
+    def write_tmp_csv_with_writes(araclar):
+        tmp_file = write_tmp_csv(araclar)
+        crud.apply_changes([Arac(**car(500))], [(5, Arac(**car(5, renk="siyah"))), (50, None)])
+        return tmp_file
+    monkeypatch.setattr(crud, "_write_tmp_csv", write_tmp_csv_with_writes)
+    crud.compact()
+
+    expected = {car_id: "beyaz" for car_id in list(range(20, 100)) + [500]}
+    expected.update({car_id: "mavi" for car_id in range(10)})
+    expected[5] = "siyah"
+    del expected[50]
+
+    # Hem bellekteki görünüm hem de diskten baştan okunan görünüm aynı olmalı
+    assert {arac.id: arac.renk for arac in crud.get_araclar()} == expected
+    monkeypatch.setattr(crud, "_cache_stamp", None)
+    monkeypatch.setattr(crud, "_overlay_stamp", None)
+    assert {arac.id: arac.renk for arac in crud.get_araclar()} == expected
+    assert crud.read_arac_at(500).id == 500 and crud.read_arac_at(50) is None
+
+# arac.py de aynı depoyu kullanır: güncelleme/silme CSV'yi baştan yazmaz, günlüğe eklenir
+def test_arac_app_updates_through_log(store):
+    arac_client = load_app("arac.py")
+    for car_id in (1, 2, 3):
+        assert arac_client.post("/araclar/", json=car(car_id)).status_code == 200
+    inode = os.stat(crud.CSV_FILE).st_ino
+
+    assert arac_client.put("/araclar/2", json=car(2, renk="mavi")).status_code == 200
+    assert arac_client.put("/araclar/9", json=car(9)).status_code == 404
+    assert arac_client.delete("/araclar/3").status_code == 200
+
+    assert os.stat(crud.CSV_FILE).st_ino == inode
+    assert os.path.exists(crud.LOG_FILE)
+    assert {arac["id"]: arac["renk"] for arac in arac_client.get("/araclar/").json()} == {1: "beyaz", 2: "mavi"}
+
+# Eşzamanlı yazımlar yazıcı iş parçacığında sıralanır: aynı id yalnızca bir kez eklenir, güncellemeler kaybolmaz
+def test_concurrent_writes_are_not_lost(store):
+    arac_client = load_app("arac.py")
+    for car_id in range(20):
+        arac_client.post("/araclar/", json=car(car_id))
+
+    def post_duplicate(_):
+        return arac_client.post("/araclar/", json=car(100)).status_code
+    def update(car_id):
+        return arac_client.put(f"/araclar/{car_id}", json=car(car_id, kilometre=car_id + 1)).status_code
+    def delete(car_id):
+        return arac_client.delete(f"/araclar/{car_id}").status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        duplicates = list(pool.map(post_duplicate, range(10)))
+        updates = list(pool.map(update, range(10)))
+        deletes = list(pool.map(delete, range(10, 15)))
+    assert sorted(duplicates) == [200] + [400] * 9
+    assert updates == [200] * 10 and deletes == [200] * 5
+
+    araclar = [arac for arac in crud.read_csv_rows() if arac.id == 100]
+    assert len(araclar) == 1
+    kilometreler = {arac["id"]: arac["kilometre"] for arac in arac_client.get("/araclar/").json()}
+    assert kilometreler == {**{car_id: car_id + 1 for car_id in range(10)}, **{car_id: car_id * 1000 for car_id in range(15, 20)}, 100: 100_000}
+
+# Arama, yazımlardan sonra güncel görünümü döndürmeli; sıkıştırma dışında anlık görüntü baştan oluşturulmaz
+def test_search_after_writes_is_incremental(client, monkeypatch):
+    for car_id in range(1, 6):
+        client.post("/cars/", json=car(car_id))
+    assert [arac["id"] for arac in client.get("/cars/search", params={"marka": "Fiat"}).json()] == [1, 2, 3, 4, 5]
+
+    builds = []
+    build_snapshot = snapshot.build_snapshot
+    monkeypatch.setattr(snapshot, "build_snapshot", lambda: builds.append(True) or build_snapshot())
+    client.put("/cars/2", json=car(2, marka="Opel"))
+    client.delete("/cars/3")
+    client.post("/cars/", json=car(6, marka="Opel", seri="Astra\nSport"))
+    client.post("/cars/", json=car(7, kilometre=1))
+
+    def search_ids(**params):
+        return sorted(arac["id"] for arac in client.get("/cars/search", params=params).json())
+    assert search_ids(marka="Fiat") == [1, 4, 5, 7]
+    assert search_ids(marka="Opel") == [2, 6]
+    assert search_ids(kilometre_max=1500) == [1, 7]
+    assert not builds
+
+    # Silinen id günlükte güncelleme olarak yeniden eklenir; yeni süreç diskteki görüntüden devam eder
+    client.post("/cars/", json=car(3, marka="Opel"))
+    monkeypatch.setattr(snapshot, "_snapshot", None)
+    assert search_ids(marka="Opel") == [2, 3, 6]
+    assert not builds
+
+    crud.compact()
+    assert search_ids(marka="Opel") == [2, 3, 6]
+    assert len(builds) == 1
+
+# Toplu ekleme: geçersiz, fazla alanlı ve tekrarlanan satırlar satır numarasıyla raporlanır, geçerliler eklenir
+def test_bulk_reports_row_errors(client):
+    client.post("/cars/", json=car(1))
+    response = client.post("/cars/bulk", json=[car(2), car(1), {"id": "x"}, "car", car(3), car(3)])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["added"] == 2
+    assert [error["row"] for error in body["errors"]] == [1, 2, 3, 5]
+
+    header = ",".join(car(4))
+    text = "\n".join([header, ",".join(str(value) for value in car(4).values()),
+                      ",".join(str(value) for value in car(5).values()) + ",fazla"])
+    response = client.post("/cars/bulk", content=text.encode(), headers={"content-type": "text/csv"})
+    assert response.json() == {"added": 1, "errors": [{"row": 1, "error": "Row has more fields than the header."}]}
+    assert client.post("/cars/bulk", content=b"{", headers={"content-type": "application/json"}).status_code == 400
+    assert client.post("/cars/bulk", content=b"\xff", headers={"content-type": "text/csv"}).status_code == 400
+    assert sorted(arac["id"] for arac in client.get("/cars/search").json()) == [1, 2, 3, 4]
+
+# Yazıcı bir gruptaki ekleme/güncelleme/silmeleri geliş sırasıyla uygular; aynı grupta silinip yeniden
+# eklenen id günlüğe yazılır ve diskten yeniden okununca da son hali görünür
+def test_writer_applies_batch_in_order(store, monkeypatch):
+    batch = [
+        writer._Mutation("insert", 1, Arac(**car(1))),
+        writer._Mutation("update", 1, Arac(**car(1, renk="mavi"))),
+        writer._Mutation("delete", 1),
+        writer._Mutation("insert", 1, Arac(**car(1, renk="siyah"))),
+        writer._Mutation("update", 2, Arac(**car(2))),
+        writer._Mutation("insert", 3, Arac(**car(3))),
+        writer._Mutation("delete", 3),
+        writer._Mutation("bulk", None, araclar=[Arac(**car(4)), Arac(**car(4)), Arac(**car(1))]),
+    ]
+    writer._apply_batch(batch)
+
+    assert [type(mutation.error).__name__ if mutation.error else None for mutation in batch] == \
+        [None, None, None, None, "NotFoundError", None, None, None]
+    assert {i: type(error).__name__ for i, error in batch[-1].errors.items()} == {1: "DuplicateIdError", 2: "DuplicateIdError"}
+
+    expected = {1: "siyah", 4: "beyaz"}
+    assert {arac.id: arac.renk for arac in crud.get_araclar()} == expected
+    monkeypatch.setattr(crud, "_cache_stamp", None)
+    monkeypatch.setattr(crud, "_overlay_stamp", None)
+    assert {arac.id: arac.renk for arac in crud.get_araclar()} == expected
+    assert [arac.id for arac in crud.read_csv_rows()] == [1, 3, 4]
@@ -0,0 +1,68 @@
+import uuid
+import sqlite3
+from sqlalchemy import delete, event
+from conftest import create_araclar, create_marka
+import main13
+
+# Toplu eklemedeki yeni renklerden biri aynı anda başka bir bağlantıdan eklenirse diğer yeni renkler yine eklenmeli
+def test_lookup_ids_survives_concurrent_insert(client):
+    marka_id = create_marka(client, "Toyota")
+    create_araclar(client, marka_id, 1)
+    engine = main13.get_engine()
+
+    inserted = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO renkler") and not inserted:
+            inserted.append(True)
+            other = sqlite3.connect(engine.url.database)
+            other.execute("INSERT INTO renkler (renk_ad) VALUES ('mavi')")
+            other.commit()
+            other.close()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.post("/araclar/bulk", json=[{"marka_id": marka_id, "seri": "Seri0", "renk": renk, "yil": 2020, "yakit": 1,
+                                                       "durum": 2, "kilometre": 0, "yakit_gucu": "150", "isActive": True}
+                                                      for renk in ("kirmizi", "mavi", "yesil")])
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert inserted
+    assert response.status_code == 200, response.text
+    assert response.json()["added"] == 3
+    renkler = {item["renk"] for item in client.get("/araclar/").json()["items"]}
+    assert renkler == {"beyaz", "kirmizi", "mavi", "yesil"}
+
+# Önbellekteki marka başka bir işçide silinmişse yabancı anahtar seri eklemesini reddeder:
+# 500 yerine 400 dönmeli, toplu eklemede satır bazında raporlanmalı ve marka önbellekten çıkmalı
+def test_stale_cached_marka_is_rejected(client):
+    engine = main13.get_engine()
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+    event.listen(engine, "connect", enable_foreign_keys)
+    engine.dispose()
+    try:
+        marka_id = create_marka(client, "Toyota")
+        gecerli_id = create_marka(client, "Fiat")
+        with engine.begin() as conn:
+            conn.execute(delete(main13.Marka).where(main13.Marka.marka_id == uuid.UUID(marka_id)))
+        assert uuid.UUID(marka_id) in main13.brand_cache
+
+        arac = {"seri": "Corolla", "renk": "beyaz", "yil": 2020, "yakit": 1, "durum": 2, "kilometre": 0, "yakit_gucu": "150", "isActive": True}
+        response = client.post("/araclar/", json=dict(arac, marka_id=marka_id))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Marka ID eksik veya hatalı."
+        assert uuid.UUID(marka_id) not in main13.brand_cache
+
+        # Önbelleğe yeniden girmiş gibi davran: toplu eklemede yalnızca o satır reddedilmeli
+        main13.brand_cache[uuid.UUID(marka_id)] = "Toyota"
+        response = client.post("/araclar/bulk", json=[dict(arac, marka_id=gecerli_id), dict(arac, marka_id=marka_id)])
+        assert response.status_code == 200
+        body = response.json()
+        assert body["added"] == 1
+        assert body["errors"] == [{"row": 1, "error": "Marka ID eksik veya hatalı."}]
+        assert body["ids"][0] is not None and body["ids"][1] is None
+        assert uuid.UUID(marka_id) not in main13.brand_cache
+    finally:
+        event.remove(engine, "connect", enable_foreign_keys)
+        engine.dispose()
@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from conftest import create_araclar, create_marka
+import main13
+
+# Blok içinde veritabanına gönderilen SQL ifadelerini say
+@contextmanager
+def count_statements():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    engine = main13.get_engine()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+# include=araclar: sürüm sorgusu + markalar + tek araç sorgusu; marka sayısıyla artmamalı (N+1 yok)
+def test_include_araclar_statement_count(client):
+    for i in range(5):
+        create_araclar(client, create_marka(client, f"Marka{i}"), 3)
+
+    with count_statements() as statements:
+        response = client.get("/markalar/", params={"include": "araclar"})
+    assert response.status_code == 200
+    assert [len(item["araclar"]) for item in response.json()["items"]] == [3] * 5
+    assert len(statements) == 3, statements
+
+# include=araclar her markadan en fazla araclar_limit araç döndürür (en eskiler), diğer markaları etkilemez
+def test_include_araclar_is_capped_per_marka(client):
+    kalabalik = create_marka(client, "Toyota")
+    ids = create_araclar(client, kalabalik, 30)
+    az = create_marka(client, "Fiat")
+    create_araclar(client, az, 2)
+
+    items = {item["marka_ad"]: item["araclar"] for item in client.get("/markalar/", params={"include": "araclar"}).json()["items"]}
+    assert [arac["arac_id"] for arac in items["Toyota"]] == ids[:20]
+    assert len(items["Fiat"]) == 2
+
+    response = client.get("/markalar/", params={"include": "araclar", "araclar_limit": 5})
+    assert [len(item["araclar"]) for item in response.json()["items"]] == [5, 2]
+    assert client.get("/markalar/", params={"include": "araclar", "araclar_limit": 101}).status_code == 422
+
+# Marka araçları: marka önbellekten doğrulanır, araçlar tek sorguda okunur
+def test_marka_araclar_statement_count(client):
+    marka_id = create_marka(client, "Toyota")
+    create_araclar(client, marka_id, 10)
+
+    with count_statements() as statements:
+        response = client.get(f"/markalar/{marka_id}/araclar")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 10
+    assert len(statements) == 1, statements
+
+# Markaya yeni araç eklenince include=araclar yanıtının ETag'i değişmeli
+def test_include_araclar_etag_changes_with_araclar(client):
+    marka_id = create_marka(client, "Toyota")
+    create_araclar(client, marka_id, 2)
+
+    first = client.get("/markalar/", params={"include": "araclar"})
+    etag = first.headers["etag"]
+    assert client.get("/markalar/", params={"include": "araclar"}, headers={"If-None-Match": etag}).status_code == 304
+
+    create_araclar(client, marka_id, 1)
+    response = client.get("/markalar/", params={"include": "araclar"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"][0]["araclar"]) == 3
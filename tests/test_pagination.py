@@ -0,0 +1,36 @@
+from conftest import create_araclar, create_marka
+
+# İmleç null olana kadar tüm sayfaları dolaş, dönen arac_id'leri sırayla topla
+def walk(client, url: str, limit: int) -> list:
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        ids.extend(item["arac_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+# Aynı saniyede eklenen araçlar sayfa sınırında atlanmamalı
+def test_araclar_walks_every_page(client):
+    marka_id = create_marka(client, "Toyota")
+    created = create_araclar(client, marka_id, 26)
+
+    ids = walk(client, "/araclar/", 5)
+    assert len(ids) == len(set(ids)) == 26
+    assert set(ids) == set(created)
+
+def test_marka_araclar_walks_every_page(client):
+    marka_id = create_marka(client, "Toyota")
+    created = create_araclar(client, marka_id, 26)
+    create_araclar(client, create_marka(client, "Honda"), 7)
+
+    ids = walk(client, f"/markalar/{marka_id}/araclar", 4)
+    assert len(ids) == len(set(ids)) == 26
+    assert set(ids) == set(created)